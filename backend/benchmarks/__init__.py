@@ -0,0 +1,7 @@
+"""
+benchmarks
+----------
+Offline performance suite for BrandGuardian.
+Uses deterministic fake LLM/embedding backends so results are reproducible
+and cost nothing. Entry point: python -m benchmarks.run
+"""
@@ -0,0 +1,48 @@
+"""
+bench_ingestion.py
+------------------
+Micro-benchmark of the ingestion ETL: text splitting, and embedding +
+upserting the chunks into a scratch Chroma collection.
+"""
+
+import time
+from typing import Dict
+
+from langchain_chroma import Chroma
+
+from benchmarks.fixtures import make_corpus
+from benchmarks.harness import run_timed, summarize
+
+SCRATCH_COLLECTION = "bench_ingestion"
+
+
+def run(iterations: int, num_docs: int) -> Dict[str, dict]:
+    """Each upsert iteration starts from an empty collection."""
+    from src.config import settings
+    from src.core.retrieval import get_embedding_function
+    from src.services.ingestion import split_text
+
+    documents = make_corpus(num_docs)
+    chunks = split_text(documents)
+
+    split_stats = run_timed(lambda: split_text(documents), iterations)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        store = Chroma(
+            collection_name=SCRATCH_COLLECTION,
+            embedding_function=get_embedding_function(),
+            persist_directory=settings.CHROMA_DB_PATH
+        )
+        upsert_start = time.perf_counter()
+        store.add_documents(chunks)
+        latencies.append(time.perf_counter() - upsert_start)
+        store.delete_collection()
+    upsert_stats = summarize(latencies, time.perf_counter() - start)
+    upsert_stats["chunks_per_s"] = round(len(chunks) / (upsert_stats["mean_ms"] / 1000), 1)
+
+    for stats in (split_stats, upsert_stats):
+        stats["documents"] = num_docs
+        stats["chunks"] = len(chunks)
+    return {"split": split_stats, "embed_upsert": upsert_stats}
@@ -0,0 +1,97 @@
+"""
+bench_retrieval.py
+------------------
+Micro-benchmark of the retrieval path used by BrandAgent:
+query embedding, MMR search over Chroma (whole collection vs. the
+request's content-type partition), and the two combined.
+"""
+
+from itertools import cycle
+from typing import Dict, List
+
+from benchmarks.fixtures import make_corpus
+from benchmarks.harness import run_timed
+
+TOPICS = [
+    "Launch of a new humidity transmitter",
+    "Weather radar for airports",
+    "Sustainability report on industrial emissions",
+    "Calibration services for life science labs",
+    "Mars mission sensor heritage",
+]
+
+
+# (topic, requested content type) pairs for the partitioned search
+PARTITIONED_QUERIES = [
+    ("Launch of a new humidity transmitter", "Press Release"),
+    ("Weather radar for airports", "LinkedIn Post"),
+    ("Sustainability report on industrial emissions", "Blog article"),
+]
+
+
+def _partition_precision(docs: List, partition: str) -> float:
+    """Share of few-shot examples that are in the requested format."""
+    return sum(doc.metadata.get("content_type") == partition for doc in docs) / len(docs) if docs else 0.0
+
+
+def seed_brand_collection(num_docs: int) -> int:
+    """
+    Fills the application's collection with a synthetic corpus, once.
+
+    Returns:
+        int: Number of chunks in the collection.
+    """
+    from src.core.retrieval import get_vector_store, record_partition_counts
+    from src.services.ingestion import split_text
+
+    store = get_vector_store()
+    existing = len(store.get(include=[])["ids"])
+    if existing:
+        return existing
+
+    chunks = split_text(make_corpus(num_docs))
+    store.add_documents(chunks)
+    record_partition_counts(store, chunks)
+    return len(chunks)
+
+
+def run(iterations: int, num_docs: int) -> Dict[str, dict]:
+    """Benchmarks each retrieval step against the production retriever config."""
+    from src.core.retrieval import content_partition, get_brand_retriever
+
+    num_chunks = seed_brand_collection(num_docs)
+    retriever = get_brand_retriever(k=3)
+    store = retriever.vectorstore
+    topics = cycle(TOPICS)
+    vectors = cycle([store.embeddings.embed_query(topic) for topic in TOPICS])
+
+    results = {
+        "embed_query": run_timed(lambda: store.embeddings.embed_query(next(topics)), iterations),
+        "mmr_search": run_timed(
+            lambda: store.max_marginal_relevance_search_by_vector(next(vectors), **retriever.search_kwargs),
+            iterations
+        ),
+        "retriever_invoke": run_timed(lambda: retriever.invoke(next(topics)), iterations),
+    }
+
+    # Full collection vs. content-type partition, on identical query vectors
+    queries = [
+        (store.embeddings.embed_query(topic), content_partition(content_type))
+        for topic, content_type in PARTITIONED_QUERIES
+    ]
+    for name, use_filter in (("mmr_full_by_type", False), ("mmr_partitioned", True)):
+        def search(vector, partition):
+            search_filter = {"content_type": partition} if use_filter else None
+            return store.max_marginal_relevance_search_by_vector(
+                vector, filter=search_filter, **retriever.search_kwargs
+            )
+
+        query_cycle = cycle(queries)
+        stats = run_timed(lambda: search(*next(query_cycle)), iterations)
+        precision = [_partition_precision(search(vector, partition), partition) for vector, partition in queries]
+        stats["partition_precision_at_k"] = round(sum(precision) / len(precision), 3)
+        results[name] = stats
+
+    for stats in results.values():
+        stats["collection_chunks"] = num_chunks
+    return results
@@ -0,0 +1,54 @@
+"""
+bench_vision.py
+---------------
+Micro-benchmark of the image validation pipeline (decode -> resize ->
+quantize -> compare) across synthetic images from 0.1 MP to 40 MP.
+The download is replaced by an in-memory response with optional latency.
+"""
+
+import time
+from typing import Dict
+from unittest.mock import patch
+
+from benchmarks.fixtures import IMAGE_SIZES, make_image_bytes
+from benchmarks.harness import run_timed
+
+
+class FakeImageResponse:
+    """Minimal stand-in for an httpx.Response carrying image bytes."""
+
+    def __init__(self, content: bytes, latency: float = 0.0):
+        self.content = content
+        self.latency = latency
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+def serve_image(name: str, latency: float = 0.0):
+    """Returns an `httpx.get` replacement that serves the named fixture."""
+    payload = make_image_bytes(name)
+
+    def fake_get(url, timeout=None):
+        time.sleep(latency)
+        return FakeImageResponse(payload)
+
+    return fake_get
+
+
+def run(iterations: int, download_latency: float = 0.0) -> Dict[str, dict]:
+    """
+    Benchmarks `validate_image_url` for every fixture size.
+    The 40 MP case runs fewer iterations to keep the suite practical.
+    """
+    from src.services.vision_service import validate_image_url
+
+    results = {}
+    for name, (width, height) in IMAGE_SIZES.items():
+        size_iterations = max(1, iterations // 3) if width * height > 20_000_000 else iterations
+        with patch("src.services.vision_service.httpx.get", serve_image(name, download_latency)):
+            stats = run_timed(lambda: validate_image_url(f"http://bench.local/{name}.jpg"), size_iterations)
+        stats["megapixels"] = round(width * height / 1e6, 1)
+        stats["encoded_bytes"] = len(make_image_bytes(name))
+        results[name] = stats
+    return results
@@ -0,0 +1,131 @@
+"""
+fakes.py
+--------
+Deterministic stand-ins for the OpenAI Chat and Embedding backends.
+Each fake can simulate upstream latency so benchmarks reflect realistic
+thread occupancy without touching the network.
+
+`install_offline_backends()` must run BEFORE anything under `src.core.agent`
+or `src.app` is imported, since those modules build their clients at import.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Same dimensionality as text-embedding-3-small
+EMBEDDING_SIZE = 1536
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Returns canned, prompt-derived text after `latency` seconds.
+    Grading prompts (which ask for JSON) get a JSON score back.
+    """
+
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        prompt = messages[-1].content
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+
+        if "Return strictly JSON" in prompt:
+            text = json.dumps({"score": 80 + int(digest, 16) % 20, "reasoning": "Precise and grounded."})
+        else:
+            text = f"Vaisala measurement insight {digest}: accurate data for a sustainable planet."
+
+        usage = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split())}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))],
+            llm_output={"token_usage": usage}
+        )
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Hash-seeded unit vectors: identical text always maps to the identical vector.
+    `latency` is charged once per call, like one HTTP round trip per batch.
+    """
+
+    def __init__(self, size: int = EMBEDDING_SIZE, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def _embed(self, text: str) -> List[float]:
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16)
+        vector = np.random.default_rng(seed).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._embed(text)
+
+
+def install_offline_backends(
+    llm_latency: float = 0.0,
+    embed_latency: float = 0.0,
+    embedding_provider: str = "fake",
+    chroma_dir: Optional[str] = None
+) -> str:
+    """
+    Points the application at the fakes and an isolated Chroma directory.
+    Any CHROMA_DB_PATH from the environment or .env is overridden, so a run
+    can never write synthetic documents into a real collection.
+
+    Args:
+        llm_latency (float): Simulated seconds per chat completion.
+        embed_latency (float): Simulated seconds per embedding call ("fake" provider only).
+        embedding_provider (str): "fake" to simulate OpenAI embeddings, or any
+            real local provider (e.g. "hashing") to benchmark it as shipped.
+        chroma_dir (str, optional): Scratch directory to use. By default a
+            temporary one is created and removed when the process exits.
+
+    Returns:
+        str: The Chroma persistence directory in use.
+    """
+    if chroma_dir is None:
+        chroma_dir = tempfile.mkdtemp(prefix="bg_bench_chroma_")
+        atexit.register(shutil.rmtree, chroma_dir, ignore_errors=True)
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+    os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+    os.environ["CHROMA_DB_PATH"] = chroma_dir
+    os.environ["JOB_QUEUE_BACKEND"] = "memory" # Never touch a configured SQLite job store
+    if embedding_provider != "fake":
+        os.environ["EMBEDDING_PROVIDER"] = embedding_provider
+
+    import src.core.retrieval as retrieval
+    import src.core.upstream as upstream
+
+    if embedding_provider == "fake":
+        embeddings = FakeEmbeddings(latency=embed_latency)
+        retrieval.get_embedding_function = lambda: embeddings
+    upstream.get_chat_model = lambda temperature, model="gpt-3.5-turbo": FakeChatModel(latency=llm_latency)
+    return chroma_dir
@@ -0,0 +1,69 @@
+"""
+fixtures.py
+-----------
+Synthetic, seeded inputs for the benchmark suite:
+images from thumbnail size up to 40 MP, and a brand-copy text corpus.
+"""
+
+from functools import lru_cache
+from io import BytesIO
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+from PIL import Image
+
+SEED = 1234
+
+# (width, height); the last entry is ~40 MP, a full-resolution camera frame
+IMAGE_SIZES = {
+    "small_0.1mp": (400, 300),
+    "medium_2mp": (1920, 1080),
+    "large_12mp": (4000, 3000),
+    "xlarge_40mp": (7728, 5152),
+}
+
+BRAND_RGB = [(0, 163, 224), (255, 255, 255), (0, 0, 0), (83, 86, 90), (162, 169, 173)]
+
+VOCABULARY = (
+    "Vaisala measurement humidity sensor accuracy data weather climate sustainable "
+    "industrial precision reliable monitoring calibration transmitter insight planet "
+    "engineers scientists observation probe atmosphere environment quality innovation"
+).split()
+
+
+@lru_cache()
+def make_image_bytes(name: str, image_format: str = "JPEG") -> bytes:
+    """
+    Renders a noisy banded image in brand colors and encodes it.
+    Cached so encoding cost is paid once per run, not per iteration.
+    """
+    width, height = IMAGE_SIZES[name]
+    rng = np.random.default_rng(SEED)
+    bands = np.array(BRAND_RGB, dtype=np.int16)[(np.arange(width) * len(BRAND_RGB)) // width]
+    pixels = np.broadcast_to(bands, (height, width, 3)).copy()
+    # Block noise keeps JPEG sizes realistic without per-pixel RNG cost on 40 MP
+    noise = rng.integers(-12, 12, size=(height // 8 + 1, width // 8 + 1, 3), dtype=np.int16)
+    pixels += np.repeat(np.repeat(noise, 8, axis=0), 8, axis=1)[:height, :width]
+
+    buffer = BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, format=image_format, quality=85)
+    return buffer.getvalue()
+
+
+# Round-robin content types, tagged the way ingestion tags real files
+CORPUS_PARTITIONS = ["social", "press", "editorial"]
+
+
+def make_corpus(num_docs: int, words_per_doc: int = 250) -> List[Document]:
+    """Generates seeded brand-copy documents, spread evenly across partitions."""
+    rng = np.random.default_rng(SEED)
+    documents = []
+    for i in range(num_docs):
+        words = rng.choice(VOCABULARY, size=words_per_doc)
+        sentences = [" ".join(words[j:j + 12]).capitalize() + "." for j in range(0, words_per_doc, 12)]
+        documents.append(Document(page_content=" ".join(sentences), metadata={
+            "source": f"synthetic_{i}.txt",
+            "content_type": CORPUS_PARTITIONS[i % len(CORPUS_PARTITIONS)]
+        }))
+    return documents
@@ -0,0 +1,56 @@
+"""
+harness.py
+----------
+Timing and reporting helpers shared by every benchmark.
+"""
+
+import resource
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far, in MB.
+    A process-wide high-water mark: it never goes down, which is why each
+    suite runs in its own process and reports a single figure.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies: List[float], wall_time: float) -> Dict[str, float]:
+    """
+    Reduces raw latencies (seconds) to the reported statistics.
+
+    Returns:
+        dict: count, p50/p95/p99/mean/max in ms and throughput per second.
+    """
+    samples = np.array(latencies) * 1000
+    return {
+        "count": len(latencies),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+        "max_ms": round(float(samples.max()), 3),
+        "throughput_per_s": round(len(latencies) / wall_time, 3) if wall_time else 0.0,
+    }
+
+
+def run_timed(fn: Callable[[], object], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """Calls `fn` sequentially and summarizes per-call latency."""
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start)
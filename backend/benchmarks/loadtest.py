@@ -0,0 +1,67 @@
+"""
+loadtest.py
+-----------
+Concurrent load test of the FastAPI app, driven in-process through
+httpx's ASGI transport. Sync endpoints still run on the server's real
+threadpool, so thread exhaustion and queueing show up in the numbers.
+"""
+
+import asyncio
+import time
+from typing import Dict
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.bench_retrieval import seed_brand_collection
+from benchmarks.bench_vision import serve_image
+from benchmarks.harness import summarize
+
+GENERATE_PAYLOAD = {
+    "topic": "Launch of the new Vaisala Optimus DGA Monitor",
+    "content_type": "LinkedIn Post",
+    "tone_modifier": "Innovative"
+}
+VALIDATE_PAYLOAD = {"image_url": "http://bench.local/medium_2mp.jpg"}
+
+
+async def _drive(app, path: str, payload: dict, total: int, concurrency: int) -> dict:
+    """Fires `total` POSTs with at most `concurrency` outstanding."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one_request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(path, json=payload, timeout=None)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total)))
+        wall_time = time.perf_counter() - start
+
+    stats = summarize(latencies, wall_time)
+    stats.update(errors=errors, concurrency=concurrency)
+    return stats
+
+
+def run(total: int, concurrency: int, num_docs: int, download_latency: float = 0.0) -> Dict[str, dict]:
+    """Load-tests /generate and /validate-image one after the other."""
+    from src.app import app
+    from src.config import settings
+
+    seed_brand_collection(num_docs)
+    results = {}
+    results["generate"] = asyncio.run(
+        _drive(app, f"{settings.API_V1_STR}/generate", GENERATE_PAYLOAD, total, concurrency)
+    )
+    with patch("src.services.vision_service.httpx.get", serve_image("medium_2mp", download_latency)):
+        results["validate_image"] = asyncio.run(
+            _drive(app, f"{settings.API_V1_STR}/validate-image", VALIDATE_PAYLOAD, total, concurrency)
+        )
+    return results
@@ -0,0 +1,142 @@
+"""
+run.py
+------
+Benchmark entrypoint. Runs the selected suites offline and writes a JSON
+report (p50/p95/p99 latency, throughput, peak RSS) for commit-to-commit comparison.
+Each suite runs in a fresh process, so its peak RSS is not inflated by the
+suites before it.
+
+Usage:
+    python -m benchmarks.run --output bench_results.json
+    python -m benchmarks.run --quick --suites vision retrieval
+    python -m benchmarks.run --quick --suites retrieval --embedding-provider hashing
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+from benchmarks.fakes import install_offline_backends
+from benchmarks.harness import peak_rss_mb
+
+SUITES = ["retrieval", "ingestion", "vision", "load"]
+
+# (full, quick) sizes per knob
+PROFILES = {
+    "full": {"iterations": 100, "vision_iterations": 9, "ingestion_iterations": 3,
+             "num_docs": 300, "requests": 200},
+    "quick": {"iterations": 20, "vision_iterations": 3, "ingestion_iterations": 1,
+              "num_docs": 50, "requests": 40},
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="BrandGuardian offline benchmark suite")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run.")
+    parser.add_argument("--output", default="bench_results.json", help="Path of the JSON report.")
+    parser.add_argument("--llm-latency-ms", type=float, default=100.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=20.0)
+    parser.add_argument(
+        "--embedding-provider", choices=["fake", "hashing"], default="fake",
+        help="'fake' simulates OpenAI embeddings; 'hashing' benchmarks the local provider."
+    )
+    parser.add_argument("--download-latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, help="Requests per endpoint in the load test.")
+    return parser.parse_args(argv)
+
+
+def run_suite(suite: str, args: argparse.Namespace) -> tuple:
+    """
+    Runs one suite offline. Meant to be called in a fresh process.
+
+    Returns:
+        tuple: (per-case stats, peak RSS of the process in MB)
+    """
+    profile = PROFILES["quick" if args.quick else "full"]
+    download_latency = args.download_latency_ms / 1000
+
+    # Must happen before any application module builds its clients
+    install_offline_backends(
+        llm_latency=args.llm_latency_ms / 1000,
+        embed_latency=args.embed_latency_ms / 1000,
+        embedding_provider=args.embedding_provider
+    )
+    from benchmarks import bench_ingestion, bench_retrieval, bench_vision, loadtest
+
+    runners = {
+        "retrieval": lambda: bench_retrieval.run(profile["iterations"], profile["num_docs"]),
+        "ingestion": lambda: bench_ingestion.run(profile["ingestion_iterations"], profile["num_docs"]),
+        "vision": lambda: bench_vision.run(profile["vision_iterations"], download_latency),
+        "load": lambda: loadtest.run(
+            args.requests or profile["requests"], args.concurrency, profile["num_docs"], download_latency
+        ),
+    }
+    # The pipeline prints per call; keep the report output readable
+    with redirect_stdout(io.StringIO()):
+        results = runners[suite]()
+    return results, round(peak_rss_mb(), 1)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": {},
+        "peak_rss_mb": {},
+    }
+
+    for suite in [s for s in SUITES if s in args.suites]:
+        print(f"⏱️  Running {suite} benchmarks...", file=sys.stderr)
+        start = time.perf_counter()
+        # "spawn" gives every suite a clean interpreter and its own RSS high-water mark
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results, rss = pool.submit(run_suite, suite, args).result()
+        report["results"][suite] = results
+        report["peak_rss_mb"][suite] = rss
+        print(f"   done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for suite, cases in report["results"].items():
+        for case, stats in cases.items():
+            print(
+                f"{suite:>10} | {case:<18} p50={stats['p50_ms']:>9.2f}ms "
+                f"p95={stats['p95_ms']:>9.2f}ms p99={stats['p99_ms']:>9.2f}ms "
+                f"thr={stats['throughput_per_s']:>8.1f}/s"
+            )
+        print(f"{suite:>10} | suite peak RSS {report['peak_rss_mb'][suite]:.0f}MB")
+    print(f"✅ Report written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,95 @@ Main FastAPI Application Entrypoint.
 Exposes endpoints for Text Generation and Image Validation.
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
 
 from src.config import settings
 from src.models.schemas import (
     BrandRequest, BrandResponse, 
-    ImageValidationRequest, ImageValidationResponse
+    ImageValidationRequest, ImageValidationResponse,
+    JobResponse
 )
-from src.core.agent import brand_agent
+from src.core.brands import UnknownBrandError, brand_registry, resolve_brand
 from src.core.guardrails import brand_guard
+from src.core.metrics import REQUEST_LATENCY, format_server_timing, track_request
+from src.services.jobs import CANCELLED, FINISHED_STATES, Job, JobManager, QueueFullError, create_job_queue
 from src.services.vision_service import validate_image_url
 
+def run_generation(request: BrandRequest) -> BrandResponse:
+    """
+    Generates content (Agent) and scores it (Guardrails).
+    Shared by the synchronous endpoint and the background job worker.
+    """
+    # 1. Generate Content (the brand's Agent, opened on demand by the registry)
+    with brand_registry.use(request.brand) as brand:
+        agent_result = brand.agent.generate(request)
+    raw_text = agent_result["content"]
+    
+    # 2. Evaluate Content (Guardrails)
+    # We run this BEFORE sending back to user (Quality Control)
+    grading = brand_guard.evaluate(raw_text)
+    
+    # 3. Return Combined Response
+    return BrandResponse(
+        content=raw_text,
+        brand_score=grading["score"],
+        reasoning=grading["reasoning"],
+        used_references=agent_result["used_references"]
+    )
+
+def run_validation(request: ImageValidationRequest) -> ImageValidationResponse:
+    """
+    Validates an image against the requested brand's palette.
+    Only the palette is needed, so the brand's retriever is not opened.
+    """
+    return validate_image_url(request.image_url, palette_path=resolve_brand(request.brand).palette_path)
+
+# Job kind -> (worker pool, handler). Generation waits on the LLM (I/O-bound);
+# image validation is dominated by decode/quantize (CPU-bound).
+JOB_HANDLERS = {
+    "generate": (
+        "io",
+        lambda payload: run_generation(BrandRequest(**payload)).model_dump(mode="json")
+    ),
+    "validate_image": (
+        "cpu",
+        lambda payload: run_validation(ImageValidationRequest(**payload)).model_dump(mode="json")
+    ),
+}
+
+job_manager = JobManager(
+    queue=create_job_queue(),
+    handlers=JOB_HANDLERS,
+    pool_sizes={"io": settings.JOB_IO_WORKERS, "cpu": settings.JOB_CPU_WORKERS}
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the job workers with the server. On shutdown, waits for in-flight
+    jobs, then closes the queue so a persistent backend hands back anything
+    unfinished right away instead of after its lease expires.
+    """
+    job_manager.start()
+    yield
+    job_manager.stop()
+    job_manager.queue.close()
+
 app = FastAPI(
     title="BrandGuardian API",
     description="Vaisala AI Brand Assistant Backend",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS (Allow Frontend to connect)
@@ -32,35 +103,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Tracks in-flight requests and total latency, and mirrors the stage
+    timings recorded during the request into a `Server-Timing` header.
+    """
+    # Label by route template (e.g. /jobs/{job_id}) to keep metric cardinality bounded
+    endpoint = next(
+        (route.path for route in app.routes if route.matches(request.scope)[0] == Match.FULL),
+        "unmatched"
+    )
+    start = time.perf_counter()
+    with track_request(endpoint) as timings:
+        response = await call_next(request)
+    duration = time.perf_counter() - start
+    REQUEST_LATENCY.labels(endpoint, request.method, response.status_code).observe(duration)
+    response.headers["Server-Timing"] = format_server_timing(timings + [("total", duration)])
+    return response
+
 @app.get("/")
 def health_check():
     """Health check endpoint to verify system status."""
     return {"status": "operational", "env": settings.ENV}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.post(f"{settings.API_V1_STR}/generate", response_model=BrandResponse)
 def generate_content(request: BrandRequest):
     """
     Generates marketing copy using RAG and scores it against brand guidelines.
     """
     try:
-        # 1. Generate Content (Agent)
-        agent_result = brand_agent.generate(request)
-        raw_text = agent_result["content"]
-        
-        # 2. Evaluate Content (Guardrails)
-        # We run this BEFORE sending back to user (Quality Control)
-        grading = brand_guard.evaluate(raw_text)
-        
-        # 3. Return Combined Response
-        return BrandResponse(
-            content=raw_text,
-            brand_score=grading["score"],
-            reasoning=grading["reasoning"],
-            used_references=agent_result["used_references"]
-        )
-        
+        return run_generation(request)
+    except UnknownBrandError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -70,10 +153,97 @@ def validate_image(request: ImageValidationRequest):
     Analyzes an image URL for Vaisala brand color compliance.
     """
     try:
-        return validate_image_url(request.image_url)
+        return run_validation(request)
+    except UnknownBrandError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- Async Job API ---
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at
+    )
+
+def _submit_job(kind: str, payload: dict) -> JobResponse:
+    """
+    Enqueues a job, translating a full queue into 429 + Retry-After.
+    Unknown brands are rejected up front rather than failing in a worker.
+    """
+    try:
+        resolve_brand(payload.get("brand"))
+    except UnknownBrandError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        job = job_manager.submit(kind, payload)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(settings.JOB_RETRY_AFTER_SECONDS)}
+        )
+    return _job_response(job)
+
+@app.post(f"{settings.API_V1_STR}/jobs/generate", response_model=JobResponse, status_code=202)
+def submit_generate_job(request: BrandRequest):
+    """
+    Queues a generation job and returns immediately.
+    Poll `GET /jobs/{job_id}` for the BrandResponse.
+    """
+    return _submit_job("generate", request.model_dump(mode="json"))
+
+@app.post(f"{settings.API_V1_STR}/jobs/validate-image", response_model=JobResponse, status_code=202)
+def submit_validate_image_job(request: ImageValidationRequest):
+    """
+    Queues an image validation job and returns immediately.
+    Poll `GET /jobs/{job_id}` for the ImageValidationResponse.
+    """
+    return _submit_job("validate_image", request.model_dump(mode="json"))
+
+@app.get(f"{settings.API_V1_STR}/jobs/{{job_id}}", response_model=JobResponse)
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=30, description="Long-poll up to N seconds for completion.")):
+    """
+    Returns a job's status and, once finished, its result.
+    With `wait`, the request is held open (without occupying a worker thread
+    between polls) until the job finishes or the wait elapses.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        # Queue lookups may hit SQLite; keep them off the event loop
+        job = await run_in_threadpool(job_manager.queue.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        if job.status in FINISHED_STATES or time.monotonic() >= deadline:
+            return _job_response(job)
+        await asyncio.sleep(0.1)
+
+@app.delete(f"{settings.API_V1_STR}/jobs/{{job_id}}", response_model=JobResponse)
+def cancel_job(job_id: str):
+    """
+    Cancels a queued or running job. A running job's result is discarded
+    when it completes. Already finished jobs return 409.
+    """
+    current = job_manager.queue.get(job_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if current.status in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job already {current.status}.")
+
+    # The job may have expired or finished since the lookup above
+    job = job_manager.queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job.status != CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}.")
+    return _job_response(job)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -6,6 +6,7 @@ Uses Pydantic BaseSettings to validate environment variables on application star
 """
 
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
@@ -17,6 +18,7 @@ class Settings(BaseSettings):
     
     # API Configuration
     OPENAI_API_KEY: str # Required. App will fail if missing.
+    OPENAI_BASE_URL: Optional[str] = None # Override to target a proxy or local mock server
     
     # App General
     ENV: str = "development"
@@ -27,8 +29,41 @@ class Settings(BaseSettings):
     CHROMA_DB_PATH: str = "data/chroma_db"
     CHROMA_COLLECTION_NAME: str = "vaisala_brand_voice"
     
+    # Multi-brand Tenancy
+    DEFAULT_BRAND: str = "vaisala" # Served from the legacy data/brand_voice + data/rules paths
+    BRANDS_DIR: str = "data/brands" # Sub-brands live in data/brands/<brand>/
+    BRAND_POOL_SIZE: int = 16 # Sub-brands kept open (LRU) besides the default
+    
+    # Embedding Provider: "openai" (network) or "hashing" (local CPU, no external services)
+    EMBEDDING_PROVIDER: str = "openai"
+    EMBEDDING_DIM: int = 512 # Vector size for the local "hashing" provider
+    
     # RAG Settings
     RAG_SIMILARITY_THRESHOLD: float = 0.75
+    RAG_PARTITION_FILTER: bool = False # Opt-in: filtered MMR is more on-format but slower than a full search
+    RAG_PARTITION_MIN_CHUNKS: int = 5 # Smaller content-type partitions fall back to the full collection
+    RAG_PARTITION_CACHE_TTL: float = 60.0 # Seconds partition counts are cached (ingestion runs out of process)
+
+    # Upstream Client (shared by chat + embedding calls)
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0
+    UPSTREAM_READ_TIMEOUT: float = 60.0
+    UPSTREAM_MAX_CONNECTIONS: int = 20
+    UPSTREAM_MAX_KEEPALIVE: int = 10
+    UPSTREAM_MAX_RETRIES: int = 3
+    UPSTREAM_BACKOFF_BASE: float = 0.5 # Seconds; doubled per attempt, full jitter
+    UPSTREAM_BACKOFF_MAX: float = 8.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5 # Consecutive failures before failing fast
+    CIRCUIT_RESET_TIMEOUT: float = 30.0 # Seconds before a half-open probe is allowed
+
+    # Background Jobs
+    JOB_QUEUE_BACKEND: str = "memory" # "memory" or "sqlite" (survives restarts)
+    JOB_QUEUE_PATH: str = "data/jobs.db"
+    JOB_QUEUE_MAX_SIZE: int = 100 # Queued jobs per pool before submissions get HTTP 429
+    JOB_IO_WORKERS: int = 8 # LLM-bound work (generation)
+    JOB_CPU_WORKERS: int = os.cpu_count() or 2 # Decode/quantize-bound work (image validation)
+    JOB_RETRY_AFTER_SECONDS: int = 5
+    JOB_RESULT_TTL: float = 3600.0 # Seconds finished jobs stay retrievable
+    JOB_LEASE_SECONDS: float = 60.0 # SQLite backend: renewed while a job runs; a crashed worker's job is retried after this
 
     # Configuration to read from .env file
     model_config = SettingsConfigDict(
@@ -5,14 +5,17 @@ The Core Logic Module.
 Orchestrates the RAG flow: Retrieval -> Prompt Augmentation -> Generation.
 """
 
-from typing import List, Dict, Any
-from langchain_openai import ChatOpenAI
+import threading
+import time
+from typing import List, Dict, Any, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 
 from src.config import settings
-from src.core.retrieval import get_brand_retriever
+from src.core.metrics import RETRIEVAL_SCOPE, TokenUsageCallback, record_cache, track_stage
+from src.core.retrieval import content_partition, get_brand_retriever, partition_counts
+from src.core.upstream import get_chat_model
 from src.models.schemas import BrandRequest, BrandResponse
 
 # Define the System Prompt
@@ -45,27 +48,61 @@ class BrandAgent:
     The main orchestrator class for text generation.
     """
     
-    def __init__(self):
+    def __init__(self, retriever=None):
         # Initialize LLM
         # We use temperature=0.7 for a balance of creativity and strict adherence
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo", # Or "gpt-4-turbo" for higher quality
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        # Shares the pooled upstream client (retries, timeouts, circuit breaker)
+        self.llm = get_chat_model(temperature=0.7) # Pass model="gpt-4-turbo" for higher quality
         
-        # Initialize Retriever
-        self.retriever = get_brand_retriever(k=3)
+        # Initialize Retriever (per-brand agents pass their own; see src.core.brands)
+        self.retriever = retriever or get_brand_retriever(k=3)
         
         # Setup Chain
         self.prompt = ChatPromptTemplate.from_template(SYSTEM_TEMPLATE)
         self.parser = StrOutputParser()
         # chain = prompt | llm | parser (We construct this dynamically below)
 
+        # (partition -> chunk count, monotonic time read)
+        self._partition_sizes: Optional[tuple] = None
+        self._partition_lock = threading.Lock()
+
     def _format_docs(self, docs: List[Document]) -> str:
         """Helper to combine retrieved docs into a single string."""
         return "\n\n".join([f"---\n{doc.page_content}\n---" for doc in docs])
 
+    def _partition_size(self, partition: str) -> int:
+        """
+        Chunks tagged with `partition`, from the counts ingestion stores in the
+        collection metadata (cached for RAG_PARTITION_CACHE_TTL).
+        """
+        now = time.monotonic()
+        with self._partition_lock:
+            cached = self._partition_sizes
+        if cached and now - cached[1] < settings.RAG_PARTITION_CACHE_TTL:
+            record_cache("partition_size", hit=True)
+            return cached[0].get(partition, 0)
+
+        record_cache("partition_size", hit=False)
+        counts = partition_counts(self.retriever.vectorstore)
+        with self._partition_lock:
+            self._partition_sizes = (counts, now)
+        return counts.get(partition, 0)
+
+    def _search_filter(self, content_type: str) -> Optional[Dict[str, str]]:
+        """
+        Restricts retrieval to the request's content-type partition, so MMR's
+        fetch_k candidates are spent on copy of the right format. Opt-in via
+        RAG_PARTITION_FILTER, since a filtered search is slower than a full one.
+        Returns None (search everything) when disabled, for unmapped types,
+        or for partitions too small to be useful.
+        """
+        if not settings.RAG_PARTITION_FILTER:
+            return None
+        partition = content_partition(content_type)
+        if partition is None or self._partition_size(partition) < settings.RAG_PARTITION_MIN_CHUNKS:
+            return None
+        return {"content_type": partition}
+
     def generate(self, request: BrandRequest) -> Dict[str, Any]:
         """
         Executes the RAG pipeline.
@@ -78,8 +115,17 @@ class BrandAgent:
         print(f"🔎 Agent finding context for: {request.topic}")
         
         # 1. Retrieval
-        # We query the vector DB using the user's topic
-        retrieved_docs = self.retriever.invoke(request.topic)
+        # We query the vector DB using the user's topic, within the content-type partition.
+        # Embedding and MMR search are run as separate steps so each can be timed.
+        vector_store = self.retriever.vectorstore
+        with track_stage("embed"):
+            query_vector = vector_store.embeddings.embed_query(request.topic)
+        search_filter = self._search_filter(request.content_type)
+        with track_stage("retrieve"):
+            retrieved_docs = vector_store.max_marginal_relevance_search_by_vector(
+                query_vector, filter=search_filter, **self.retriever.search_kwargs
+            )
+        RETRIEVAL_SCOPE.labels(scope="partition" if search_filter else "full").inc()
         formatted_context = self._format_docs(retrieved_docs)
         
         print(f"✅ Found {len(retrieved_docs)} reference examples.")
@@ -87,12 +133,16 @@ class BrandAgent:
         # 2. Generation
         chain = self.prompt | self.llm | self.parser
         
-        generated_text = chain.invoke({
-            "content_type": request.content_type,
-            "topic": request.topic,
-            "tone_modifier": request.tone_modifier or "Professional",
-            "context": formatted_context
-        })
+        with track_stage("generate"):
+            generated_text = chain.invoke(
+                {
+                    "content_type": request.content_type,
+                    "topic": request.topic,
+                    "tone_modifier": request.tone_modifier or "Professional",
+                    "context": formatted_context
+                },
+                config={"callbacks": [TokenUsageCallback("generate")]}
+            )
 
         # 3. Structure Output
         # Extract snippets for the "Used References" field
@@ -103,5 +153,5 @@ class BrandAgent:
             "used_references": references
         }
 
-# Singleton instance for import
+# Singleton instance for import (default brand)
 brand_agent = BrandAgent()
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+brands.py
+---------
+Multi-brand tenancy.
+Resolves a brand id to its data (voice corpus, palette, Chroma collection)
+and keeps the hot brands' retrievers and palettes open in a size-bounded
+LRU pool, so one process can serve many brands without loading them all.
+
+Layout:
+    Default brand:  data/brand_voice/, data/rules/palette.json, CHROMA_COLLECTION_NAME in CHROMA_DB_PATH
+    Other brands:   data/brands/<brand>/brand_voice/, data/brands/<brand>/rules/palette.json
+                    (falls back to the default palette), collection "<CHROMA_COLLECTION_NAME>-<brand>"
+                    in CHROMA_DB_PATH/brands/<brand>/
+
+Each sub-brand has its own Chroma directory because Chroma keeps one client
+(and one in-memory index cache) per directory: closing that client is the
+only way to unload an evicted brand's index.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from src.config import settings
+from src.core.metrics import record_cache
+from src.models.schemas import BRAND_ID_REGEX
+from src.services.vision_service import PALETTE_PATH, _load_palette, evict_palette
+
+# The default brand's voice corpus; its palette is the vision service's PALETTE_PATH
+DEFAULT_VOICE_DIR = "data/brand_voice"
+
+BRAND_ID_PATTERN = re.compile(BRAND_ID_REGEX)
+
+
+class UnknownBrandError(LookupError):
+    """Raised when a brand id has no data directory."""
+
+
+@dataclass(frozen=True)
+class BrandPaths:
+    brand_id: str
+    voice_dir: str
+    palette_path: str
+    collection_name: str
+    chroma_path: str
+
+
+def resolve_brand(brand_id: Optional[str] = None) -> BrandPaths:
+    """
+    Maps a brand id (None = default brand) to its data locations.
+
+    Raises:
+        UnknownBrandError: The id is malformed or has no data directory.
+    """
+    brand_id = brand_id or settings.DEFAULT_BRAND
+    if brand_id == settings.DEFAULT_BRAND:
+        return BrandPaths(
+            brand_id, DEFAULT_VOICE_DIR, PALETTE_PATH, settings.CHROMA_COLLECTION_NAME, settings.CHROMA_DB_PATH
+        )
+
+    brand_dir = os.path.join(settings.BRANDS_DIR, brand_id)
+    if not BRAND_ID_PATTERN.match(brand_id) or not os.path.isdir(brand_dir):
+        raise UnknownBrandError(f"Unknown brand '{brand_id}'.")
+
+    palette_path = os.path.join(brand_dir, "rules", "palette.json")
+    return BrandPaths(
+        brand_id=brand_id,
+        voice_dir=os.path.join(brand_dir, "brand_voice"),
+        palette_path=palette_path if os.path.exists(palette_path) else PALETTE_PATH,
+        collection_name=f"{settings.CHROMA_COLLECTION_NAME}-{brand_id}",
+        chroma_path=os.path.join(settings.CHROMA_DB_PATH, "brands", brand_id)
+    )
+
+
+class BrandContext:
+    """
+    One brand's open resources: its agent (retriever over the brand's
+    collection, with its own Chroma client) and its palette, warmed into
+    the vision service's cache.
+    """
+
+    def __init__(self, paths: BrandPaths, agent, client=None):
+        self.paths = paths
+        self.agent = agent
+        self._client = client
+        self._users = 0
+        self._closing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, paths: BrandPaths) -> "BrandContext":
+        # Imported lazily: importing the agent module opens the default brand's store
+        from src.core.agent import BrandAgent
+        from src.core.retrieval import get_brand_retriever
+
+        retriever = get_brand_retriever(k=3, collection_name=paths.collection_name, persist_directory=paths.chroma_path)
+        _load_palette(paths.palette_path)
+        return cls(paths, BrandAgent(retriever=retriever), client=retriever.vectorstore._client)
+
+    def acquire(self) -> None:
+        """Marks the context as used by a request (see `BrandRegistry.use`)."""
+        with self._lock:
+            self._users += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._users -= 1
+            last_user = self._closing and self._users == 0
+        if last_user:
+            self._release_resources()
+
+    def close(self) -> None:
+        """
+        Releases the brand's resources: the cached palette, and the Chroma
+        client, whose shutdown unloads the collection's index from memory.
+        Requests still using the brand finish first; the last one releases.
+        """
+        with self._lock:
+            self._closing = True
+            idle = self._users == 0
+        if idle:
+            self._release_resources()
+
+    def _release_resources(self) -> None:
+        if self.paths.palette_path != PALETTE_PATH:
+            evict_palette(self.paths.palette_path)
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class BrandRegistry:
+    """
+    Thread-safe LRU pool of BrandContexts.
+    The default brand is pinned (it reuses the module-level `brand_agent`)
+    and does not count toward `max_size`.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._pool: "OrderedDict[str, BrandContext]" = OrderedDict()
+        self._default: Optional[BrandContext] = None
+        self._lock = threading.Lock()
+
+    def _default_context(self) -> BrandContext:
+        if self._default is None:
+            from src.core.agent import brand_agent
+            self._default = BrandContext(resolve_brand(settings.DEFAULT_BRAND), brand_agent)
+        return self._default
+
+    def get(self, brand_id: Optional[str] = None) -> BrandContext:
+        """
+        Returns the brand's context, opening it on first use.
+        Request handlers should prefer `use`, which keeps an evicted brand
+        open until they are done with it.
+
+        Raises:
+            UnknownBrandError: The brand does not exist.
+        """
+        return self._checkout(brand_id, acquire=False)
+
+    @contextmanager
+    def use(self, brand_id: Optional[str] = None) -> Iterator[BrandContext]:
+        """
+        Checks a brand out for the duration of a request.
+
+        Raises:
+            UnknownBrandError: The brand does not exist.
+        """
+        context = self._checkout(brand_id, acquire=True)
+        try:
+            yield context
+        finally:
+            context.release()
+
+    def _checkout(self, brand_id: Optional[str], acquire: bool) -> BrandContext:
+        paths = resolve_brand(brand_id)
+        if paths.brand_id == settings.DEFAULT_BRAND:
+            context = self._default_context()
+            if acquire:
+                context.acquire()
+            return context
+
+        # Contexts are acquired under the pool lock, so one cannot be evicted
+        # and released between being looked up and being marked in use
+        with self._lock:
+            context = self._pool.get(paths.brand_id)
+            if context is not None:
+                self._pool.move_to_end(paths.brand_id)
+                if acquire:
+                    context.acquire()
+                record_cache("brand_pool", hit=True)
+                return context
+        record_cache("brand_pool", hit=False)
+
+        # Open outside the lock so a cold brand doesn't stall requests for hot ones
+        opened = BrandContext.open(paths)
+
+        evicted = []
+        with self._lock:
+            context = self._pool.get(paths.brand_id)
+            if context is None:
+                context = self._pool[paths.brand_id] = opened
+            self._pool.move_to_end(paths.brand_id)
+            if acquire:
+                context.acquire()
+            while len(self._pool) > self.max_size:
+                evicted.append(self._pool.popitem(last=False)[1])
+
+        if context is not opened:
+            opened.close() # Lost a race with another thread opening the same brand
+        for cold in evicted:
+            print(f"🧊 Evicting brand from pool: {cold.paths.brand_id}")
+            cold.close()
+        return context
+
+    def open_brands(self) -> list:
+        """Ids currently held in the pool, coldest first."""
+        with self._lock:
+            return list(self._pool)
+
+
+brand_registry = BrandRegistry(max_size=settings.BRAND_POOL_SIZE)
@@ -5,11 +5,11 @@ Implements the "Brand Score" logic.
 Uses a secondary LLM call to grade generated content against Vaisala guidelines.
 """
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
-from src.config import settings
+from src.core.metrics import TokenUsageCallback, track_stage
+from src.core.upstream import get_chat_model
 
 # Define the structure for the grading output
 class BrandScoreResult(BaseModel):
@@ -33,16 +33,16 @@ Return strictly JSON.
 
 class BrandGuard:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0, # Deterministic grading
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        self.llm = get_chat_model(temperature=0) # Deterministic grading
         self.parser = JsonOutputParser(pydantic_object=BrandScoreResult)
         self.prompt = ChatPromptTemplate.from_template(GRADING_TEMPLATE)
 
     def evaluate(self, text: str) -> BrandScoreResult:
         chain = self.prompt | self.llm | self.parser
-        return chain.invoke({"text": text})
+        with track_stage("grade"):
+            return chain.invoke(
+                {"text": text},
+                config={"callbacks": [TokenUsageCallback("grade")]}
+            )
 
 brand_guard = BrandGuard()
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+metrics.py
+----------
+Timing & Metrics layer.
+Defines the Prometheus collectors and helpers used across the pipeline,
+and collects per-request stage timings for the `Server-Timing` header.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import Counter, Gauge, Histogram
+
+# Buckets span sub-millisecond cache hits up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    "brandguardian_request_duration_seconds",
+    "End-to-end HTTP request latency.",
+    ["endpoint", "method", "status"],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "brandguardian_stage_duration_seconds",
+    "Latency of individual pipeline stages (embed, retrieve, generate, grade, download, ...).",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "brandguardian_requests_in_flight",
+    "HTTP requests currently being processed.",
+    ["endpoint"]
+)
+CACHE_EVENTS = Counter(
+    "brandguardian_cache_events_total",
+    "Cache lookups by cache name and result (hit/miss).",
+    ["cache", "result"]
+)
+LLM_TOKENS = Counter(
+    "brandguardian_llm_tokens_total",
+    "LLM tokens consumed, by pipeline stage and token type (prompt/completion).",
+    ["stage", "type"]
+)
+RETRIEVAL_SCOPE = Counter(
+    "brandguardian_retrieval_scope_total",
+    "Retrievals by search scope: a content-type partition or the full collection.",
+    ["scope"]
+)
+JOBS_TOTAL = Counter(
+    "brandguardian_jobs_total",
+    "Background jobs by kind and outcome (queued/rejected/succeeded/failed).",
+    ["kind", "status"]
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "brandguardian_job_queue_depth",
+    "Jobs waiting in each worker pool's queue.",
+    ["pool"]
+)
+
+# Per-request list of (stage, seconds); None outside a tracked request
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def track_request(endpoint: str) -> Iterator[List[Tuple[str, float]]]:
+    """
+    Marks a request as in-flight and collects the stage timings recorded inside it.
+    Yields the timings list so the caller can render a `Server-Timing` header.
+    """
+    timings: List[Tuple[str, float]] = []
+    token = _request_timings.set(timings)
+    IN_FLIGHT.labels(endpoint=endpoint).inc()
+    try:
+        yield timings
+    finally:
+        IN_FLIGHT.labels(endpoint=endpoint).dec()
+        _request_timings.reset(token)
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Times a pipeline stage into the histogram and the current request's timings."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_LATENCY.labels(stage=stage).observe(duration)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, duration))
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Counts a cache lookup."""
+    CACHE_EVENTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def format_server_timing(timings: List[Tuple[str, float]]) -> str:
+    """Renders timings as a `Server-Timing` header value (durations in ms)."""
+    return ", ".join(f"{stage};dur={duration * 1000:.1f}" for stage, duration in timings)
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """LangChain callback that counts prompt/completion tokens for one stage."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        LLM_TOKENS.labels(stage=self.stage, type="prompt").inc(usage.get("prompt_tokens") or 0)
+        LLM_TOKENS.labels(stage=self.stage, type="completion").inc(usage.get("completion_tokens") or 0)
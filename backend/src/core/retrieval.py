@@ -2,52 +2,236 @@
 retrieval.py
 ------------
 Manages the Vector Database connection and Embedding logic.
+The embedding backend is pluggable via `EMBEDDING_PROVIDER`:
+- "openai":  text-embedding-3-small over the network.
+- "hashing": local, CPU-only hashed bag-of-words projection (no external services).
 """
 
 import os
-from typing import List
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from src.config import settings
+from src.core.upstream import get_http_client, get_timeout
 
-def get_embedding_function():
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Collection metadata key recording which embedding space the vectors live in
+EMBEDDING_METADATA_KEY = "embedding_provider"
+
+# Untagged collections predate provider tagging and were built with OpenAI
+LEGACY_EMBEDDING_TAG = f"openai:{OPENAI_EMBEDDING_MODEL}"
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Retrieval partitions. Chunks are tagged with one at ingestion and requests are
+# routed to one by format name, checked in order ("Blog post" is editorial, not social).
+# Only whole words match, and topics ("sustainability", "product") are deliberately
+# absent: they say nothing about the format, so such files are tagged via manifest.json.
+CONTENT_PARTITIONS = {
+    "editorial": ("blog", "article", "newsletter", "email", "memo", "report", "whitepaper", "editorial"),
+    "press": ("press", "release", "announcement", "datasheet", "brochure"),
+    "social": ("social", "linkedin", "twitter", "tweet", "instagram", "facebook", "post"),
+}
+
+# Tag for chunks that match no partition; only reachable via full-collection search
+GENERAL_PARTITION = "general"
+
+# Collection metadata key prefix for per-partition chunk counts, kept up to date by
+# ingestion so queries never have to count a partition's chunks
+PARTITION_COUNT_PREFIX = "chunks:"
+
+def content_partition(content_type: str) -> Optional[str]:
+    """
+    Maps a free-form content type ("LinkedIn Post", "Press Releases", a filename
+    prefix, ...) onto a retrieval partition, or None if nothing matches.
+    """
+    words = set(_TOKEN_PATTERN.findall(content_type.lower()))
+    words |= {word[:-1] for word in words if word.endswith("s")} # Plurals
+    for partition, keywords in CONTENT_PARTITIONS.items():
+        if not words.isdisjoint(keywords):
+            return partition
+    return None
+
+def record_partition_counts(vector_store: Chroma, documents: List[Document]) -> None:
+    """Adds the documents' chunks to the per-partition counts in the collection metadata."""
+    added = Counter(doc.metadata.get("content_type", GENERAL_PARTITION) for doc in documents)
+    collection = vector_store._client.get_collection(vector_store._collection.name)
+    # hnsw:* keys are fixed at creation and may not be sent back to modify()
+    metadata = {key: value for key, value in (collection.metadata or {}).items() if not key.startswith("hnsw:")}
+    for partition, count in added.items():
+        key = PARTITION_COUNT_PREFIX + partition
+        metadata[key] = metadata.get(key, 0) + count
+    collection.modify(metadata=metadata)
+
+def partition_counts(vector_store: Chroma) -> Dict[str, int]:
+    """
+    Chunk counts per partition, read from the collection metadata (one lookup,
+    independent of collection size). Collections ingested before counts were
+    recorded report none, so partitioned search falls back to the full collection.
+    """
+    metadata = vector_store._client.get_collection(vector_store._collection.name).metadata or {}
+    return {
+        key[len(PARTITION_COUNT_PREFIX):]: value
+        for key, value in metadata.items() if key.startswith(PARTITION_COUNT_PREFIX)
+    }
+
+@lru_cache(maxsize=65536)
+def _hash_feature(feature: str, dim: int) -> Tuple[int, float]:
+    """
+    Maps a feature to a (bucket, sign) pair.
+    Uses crc32 rather than hash() so vectors are stable across processes.
     """
-    Returns the OpenAI Embedding function using the API key from settings.
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+class HashingEmbeddings(Embeddings):
+    """
+    Local embedding via the signed hashing trick over word unigrams + bigrams.
+    Term frequencies are sublinearly scaled and each vector is L2-normalized,
+    so cosine similarity behaves like a TF projection. Batches are built with
+    a single vectorized scatter-add into one NumPy matrix.
     """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_PATTERN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                col, sign = _hash_feature(feature, self.dim)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), signs)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_batch(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0].tolist()
+
+def _openai_embeddings() -> Embeddings:
     return OpenAIEmbeddings(
-        model="text-embedding-3-small",
-        openai_api_key=settings.OPENAI_API_KEY
+        model=OPENAI_EMBEDDING_MODEL,
+        openai_api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        http_client=get_http_client(),
+        request_timeout=get_timeout(),
+        max_retries=0 # Retries are owned by the shared transport
     )
 
-def get_vector_store() -> Chroma:
+def _hashing_embeddings() -> Embeddings:
+    return HashingEmbeddings(dim=settings.EMBEDDING_DIM)
+
+EMBEDDING_PROVIDERS = {
+    "openai": _openai_embeddings,
+    "hashing": _hashing_embeddings,
+}
+
+def get_embedding_tag() -> str:
+    """
+    Identifies the configured embedding space, e.g. "openai:text-embedding-3-small"
+    or "hashing:512". Vectors from different tags are not comparable.
+    """
+    if settings.EMBEDDING_PROVIDER == "openai":
+        return LEGACY_EMBEDDING_TAG
+    return f"{settings.EMBEDDING_PROVIDER}:{settings.EMBEDDING_DIM}"
+
+@lru_cache()
+def get_embedding_function() -> Embeddings:
+    """
+    Returns the Embedding function selected by `EMBEDDING_PROVIDER`.
+    Cached so every vector store shares one instance (and, for OpenAI, the pooled upstream client).
+    """
+    try:
+        factory = EMBEDDING_PROVIDERS[settings.EMBEDDING_PROVIDER]
+    except KeyError:
+        raise ValueError(
+            f"Unknown EMBEDDING_PROVIDER '{settings.EMBEDDING_PROVIDER}'. "
+            f"Expected one of: {', '.join(EMBEDDING_PROVIDERS)}"
+        )
+    return factory()
+
+def _check_embedding_tag(vector_store: Chroma) -> None:
+    """
+    Refuses to open a collection built in a different embedding space.
+    Empty untagged collections are claimed for the current provider.
+    """
+    collection = vector_store._collection
+    expected = get_embedding_tag()
+    metadata = dict(collection.metadata or {})
+    found = metadata.get(EMBEDDING_METADATA_KEY)
+
+    if found is None:
+        if collection.count() == 0:
+            metadata[EMBEDDING_METADATA_KEY] = expected
+            collection.modify(metadata=metadata)
+            return
+        found = LEGACY_EMBEDDING_TAG
+
+    if found != expected:
+        raise ValueError(
+            f"Collection '{collection.name}' was built with '{found}' embeddings, "
+            f"but the configured provider is '{expected}'. "
+            "Re-ingest into a new collection or run `make clean-db`."
+        )
+
+def get_vector_store(collection_name: Optional[str] = None, persist_directory: Optional[str] = None) -> Chroma:
     """
     Initializes and returns the ChromaDB vector store.
+    
+    Args:
+        collection_name (str, optional): Defaults to `CHROMA_COLLECTION_NAME` (the default brand).
+        persist_directory (str, optional): Defaults to `CHROMA_DB_PATH` (the default brand).
     """
     embedding_fn = get_embedding_function()
+    persist_directory = persist_directory or settings.CHROMA_DB_PATH
     
     # Ensure directory exists to prevent errors on fresh clones
-    os.makedirs(settings.CHROMA_DB_PATH, exist_ok=True)
+    os.makedirs(persist_directory, exist_ok=True)
     
     vector_store = Chroma(
-        persist_directory=settings.CHROMA_DB_PATH,
+        persist_directory=persist_directory,
         embedding_function=embedding_fn,
-        collection_name=settings.CHROMA_COLLECTION_NAME
+        collection_name=collection_name or settings.CHROMA_COLLECTION_NAME
     )
+    _check_embedding_tag(vector_store)
     
     return vector_store
 
-def get_brand_retriever(k: int = 3):
+def get_brand_retriever(k: int = 3, collection_name: Optional[str] = None, persist_directory: Optional[str] = None):
     """
     Returns a retriever configured for 'Maximal Marginal Relevance' (MMR).
     
     Args:
         k (int): Number of documents to return.
+        collection_name (str, optional): Brand collection; defaults to the default brand's.
+        persist_directory (str, optional): Brand's Chroma directory; defaults to the default brand's.
         
     Returns:
         VectorStoreRetriever: Configured retriever object.
     """
-    vector_store = get_vector_store()
+    vector_store = get_vector_store(collection_name, persist_directory)
     
     # MMR (Maximal Marginal Relevance) ensures we get diverse examples,
     # not just 3 versions of the exact same sentence.
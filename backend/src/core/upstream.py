@@ -0,0 +1,213 @@
+"""
+upstream.py
+-----------
+Shared HTTP client for all OpenAI traffic (Chat + Embeddings).
+One pooled connection pool per process, with consistent timeouts,
+jittered retries on 429/5xx and a circuit breaker that fails fast
+when the upstream is degraded (5xx and transport errors; rate limiting
+is the upstream working as intended and never trips it).
+"""
+
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Optional
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from src.config import settings
+
+# Status codes worth retrying: rate limiting and transient server errors
+RATE_LIMITED = 429
+RETRYABLE_STATUS_CODES = frozenset({RATE_LIMITED, 500, 502, 503, 504})
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+
+    CLOSED    -> requests flow normally.
+    OPEN      -> requests are rejected until `reset_timeout` has elapsed.
+    HALF_OPEN -> a single probe request is allowed through; its outcome
+                 closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        # Caller must hold the lock
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Returns True if a request may be sent right now."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Ends a request that says nothing about upstream health (e.g. a 429)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """
+    httpx transport wrapper that adds retries and circuit breaking.
+    Retries use exponential backoff with full jitter and honour `Retry-After`;
+    a 429 asking to wait longer than `backoff_max` is returned, not retried early.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        breaker: CircuitBreaker,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self._transport = transport
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("retry-after")
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                raise CircuitOpenError("Upstream circuit is open; failing fast.", request=request)
+
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+
+                if response.status_code == RATE_LIMITED:
+                    self.breaker.release_probe()
+                else:
+                    self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                elif delay > self.backoff_max:
+                    return response # Let the caller see how long the upstream wants us to back off
+                response.close()
+
+            attempt += 1
+            self._sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def get_timeout() -> httpx.Timeout:
+    """Returns the upstream timeout policy from settings."""
+    return httpx.Timeout(settings.UPSTREAM_READ_TIMEOUT, connect=settings.UPSTREAM_CONNECT_TIMEOUT)
+
+
+@lru_cache()
+def get_http_client() -> httpx.Client:
+    """
+    Creates and caches the process-wide upstream HTTP client.
+    Connection limits live on the inner transport, since httpx ignores
+    `limits` on the Client when a custom transport is supplied.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE
+    )
+    transport = ResilientTransport(
+        httpx.HTTPTransport(limits=limits),
+        breaker=CircuitBreaker(settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_TIMEOUT),
+        max_retries=settings.UPSTREAM_MAX_RETRIES,
+        backoff_base=settings.UPSTREAM_BACKOFF_BASE,
+        backoff_max=settings.UPSTREAM_BACKOFF_MAX
+    )
+    return httpx.Client(transport=transport, timeout=get_timeout())
+
+
+def get_chat_model(temperature: float, model: str = "gpt-3.5-turbo") -> ChatOpenAI:
+    """
+    Returns a ChatOpenAI bound to the shared client.
+    SDK-level retries are disabled so the transport owns the retry policy.
+    """
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        openai_api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        http_client=get_http_client(),
+        timeout=get_timeout(),
+        max_retries=0
+    )
@@ -4,9 +4,13 @@ schemas.py
 Pydantic models for Request and Response objects.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field, HttpUrl, ConfigDict
 
+# Lowercase slug; brand ids become directory and collection names,
+# and Chroma requires collection names to start and end alphanumeric
+BRAND_ID_REGEX = r"^[a-z0-9](?:[a-z0-9_-]{0,61}[a-z0-9])?$"
+
 # --- Generation Models (Text) ---
 
 class BrandRequest(BaseModel):
@@ -16,6 +20,7 @@ class BrandRequest(BaseModel):
     topic: str = Field(..., description="The main subject.", min_length=3)
     content_type: str = Field(..., description="The format required.")
     tone_modifier: Optional[str] = Field("Professional", description="Optional nuance.")
+    brand: Optional[str] = Field(None, description="Brand id; defaults to the main brand.", pattern=BRAND_ID_REGEX)
     
     # Modern Pydantic v2 Config
     model_config = ConfigDict(
@@ -44,6 +49,7 @@ class ImageValidationRequest(BaseModel):
     Schema for image validation requests.
     """
     image_url: HttpUrl = Field(..., description="Publicly accessible URL.")
+    brand: Optional[str] = Field(None, description="Brand id; defaults to the main brand.", pattern=BRAND_ID_REGEX)
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -59,4 +65,19 @@ class ImageValidationResponse(BaseModel):
     """
     is_compliant: bool = Field(..., description="True if compliant.")
     dominant_colors: List[str] = Field(..., description="Detected Hex codes.")
-    violation_reason: Optional[str] = Field(None, description="Explanation.")
\ No newline at end of file
+    violation_reason: Optional[str] = Field(None, description="Explanation.")
+
+# --- Job Models (Async API) ---
+
+class JobResponse(BaseModel):
+    """
+    Schema for a background job's state.
+    `result` holds a BrandResponse or ImageValidationResponse once succeeded.
+    """
+    job_id: str = Field(..., description="Identifier to poll or cancel.")
+    kind: str = Field(..., description="'generate' or 'validate_image'.")
+    status: str = Field(..., description="queued | running | succeeded | failed | cancelled.")
+    result: Optional[Dict[str, Any]] = Field(None, description="Job output when succeeded.")
+    error: Optional[str] = Field(None, description="Failure reason when failed.")
+    created_at: float = Field(..., description="Unix timestamp of submission.")
+    updated_at: float = Field(..., description="Unix timestamp of the last state change.")
@@ -2,22 +2,52 @@
 ingestion.py
 ------------
 ETL Script to load raw text files into the Vector Database.
-Usage: python -m src.services.ingestion
+Usage: python -m src.services.ingestion [--brand <brand>]
+
+Each chunk is tagged with `source` (file name) and `content_type` (retrieval
+partition). The content type comes from an optional sidecar `manifest.json`
+in the source directory, e.g. {"launch_indigo.txt": {"content_type": "Press Release"}},
+and otherwise from the file name prefix ("social_mars_mission.txt" -> social).
 """
 
+import argparse
+import json
 import os
 import glob
-from typing import List
+from typing import List, Optional
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from src.core.retrieval import get_vector_store
+from src.core.brands import resolve_brand
+from src.core.retrieval import GENERAL_PARTITION, content_partition, get_vector_store, record_partition_counts
 from src.config import settings
 
+MANIFEST_FILENAME = "manifest.json"
+
+def load_manifest(directory: str) -> dict:
+    """Reads the optional sidecar manifest (file name -> metadata overrides)."""
+    manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def tag_document(document, manifest: dict):
+    """
+    Sets the `source` and `content_type` metadata used for partitioned retrieval.
+    Manifest entries win over the file name convention.
+    """
+    filename = os.path.basename(document.metadata["source"])
+    declared = manifest.get(filename, {}).get("content_type") or filename.split("_")[0]
+    document.metadata["source"] = filename
+    document.metadata["content_type"] = content_partition(declared) or GENERAL_PARTITION
+    return document
+
 def load_documents(directory: str) -> List:
     """
-    Loads all .txt files from the specified directory.
+    Loads all .txt files from the specified directory, tagged with partition metadata.
     """
     documents = []
+    manifest = load_manifest(directory)
     # Find all .txt files
     file_paths = glob.glob(os.path.join(directory, "*.txt"))
     
@@ -30,8 +60,9 @@ def load_documents(directory: str) -> List:
     for file_path in file_paths:
         try:
             loader = TextLoader(file_path, encoding='utf-8')
-            documents.extend(loader.load())
-            print(f"   - Loaded: {os.path.basename(file_path)}")
+            loaded = [tag_document(doc, manifest) for doc in loader.load()]
+            documents.extend(loaded)
+            print(f"   - Loaded: {os.path.basename(file_path)} [{loaded[0].metadata['content_type']}]")
         except Exception as e:
             print(f"   ❌ Error loading {file_path}: {e}")
             
@@ -52,12 +83,17 @@ def split_text(documents: List):
     print(f"✂️  Split {len(documents)} docs into {len(chunks)} chunks.")
     return chunks
 
-def ingest_data():
+def ingest_data(brand_id: Optional[str] = None):
     """
     Main execution function.
+    
+    Args:
+        brand_id (str, optional): Brand to ingest; defaults to the main brand.
     """
-    # 1. Define source directory
-    source_dir = "data/brand_voice"
+    # 1. Define source directory (and target collection) for the brand
+    brand = resolve_brand(brand_id)
+    source_dir = brand.voice_dir
+    print(f"🏷️  Brand: {brand.brand_id} -> collection '{brand.collection_name}'")
     
     # 2. Load
     raw_docs = load_documents(source_dir)
@@ -69,10 +105,11 @@ def ingest_data():
 
     # 4. Store (Embed & Upsert)
     print("🧠 Initializing Vector Store...")
-    vector_store = get_vector_store()
+    vector_store = get_vector_store(brand.collection_name, brand.chroma_path)
     
     print("🚀 Embedding and storing vectors... (This may take a moment)")
     vector_store.add_documents(chunks)
+    record_partition_counts(vector_store, chunks)
     
     # Chroma automatically persists, but explicit call is good practice in older versions
     # vector_store.persist() 
@@ -80,10 +117,14 @@ def ingest_data():
     print("✅ Ingestion Complete! Brand memory updated.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest brand voice documents into the vector database.")
+    parser.add_argument("--brand", default=None, help="Brand id (default: the main brand).")
+    args = parser.parse_args()
+
     ingestion_start_msg = """
     ===========================================
       BrandGuardian | Knowledge Ingestion
     ===========================================
     """
     print(ingestion_start_msg)
-    ingestion_done = ingest_data()
\ No newline at end of file
+    ingestion_done = ingest_data(args.brand)
\ No newline at end of file
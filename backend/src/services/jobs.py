@@ -0,0 +1,459 @@
+"""
+jobs.py
+-------
+Asynchronous Job subsystem for long-running generations and validations.
+Clients submit work and get a job id back immediately; a worker pool drains
+a bounded queue, and a full queue is reported as backpressure (HTTP 429).
+
+Two interchangeable queue backends:
+- InMemoryJobQueue: fastest; jobs are lost on restart.
+- SQLiteJobQueue:  persisted locally and safe to share between processes;
+                   queued jobs, and running jobs whose lease expired, resume after a restart.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.config import settings
+from src.core.metrics import JOB_QUEUE_DEPTH, JOBS_TOTAL
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a pool's queue is at capacity."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    pool: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+
+class JobQueue(ABC):
+    """
+    Interface shared by the queue backends; a backend missing a method fails at construction.
+    Capacity is enforced per pool so CPU-bound work cannot starve I/O-bound work.
+    """
+
+    def __init__(self, max_size: int, result_ttl: float):
+        self.max_size = max_size
+        self.result_ttl = result_ttl
+        self._cond = threading.Condition()
+
+    @abstractmethod
+    def submit(self, kind: str, pool: str, payload: Dict[str, Any]) -> Job:
+        """Enqueues a job; raises QueueFullError when the pool is at capacity."""
+
+    @abstractmethod
+    def claim(self, pool: str, timeout: float) -> Optional[Job]:
+        """Blocks up to `timeout` seconds for the next queued job and marks it running."""
+
+    @abstractmethod
+    def complete(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """Stores the outcome, unless the job was cancelled while running."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns a snapshot of the job, or None if unknown or expired."""
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancels a queued or running job. Finished jobs are returned unchanged."""
+
+    @abstractmethod
+    def depth(self, pool: str) -> int:
+        """Number of queued (not yet claimed) jobs in the pool."""
+
+    # Seconds between lease renewals for running jobs; None if the backend has no leases
+    heartbeat_interval: Optional[float] = None
+
+    def renew(self, job_id: str) -> bool:
+        """Extends the lease on a running job. Returns False once the job is no longer ours."""
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryJobQueue(JobQueue):
+    """Process-local queue backed by deques; jobs do not survive a restart."""
+
+    def __init__(self, max_size: int, result_ttl: float):
+        super().__init__(max_size, result_ttl)
+        self._jobs: Dict[str, Job] = {}
+        self._pending: Dict[str, deque] = {}
+
+    def _prune(self, now: float) -> None:
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATES and now - job.updated_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, kind: str, pool: str, payload: Dict[str, Any]) -> Job:
+        with self._cond:
+            now = time.time()
+            self._prune(now)
+            pending = self._pending.setdefault(pool, deque())
+            if len(pending) >= self.max_size:
+                raise QueueFullError(f"The '{pool}' job queue is full ({self.max_size} jobs).")
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, pool=pool, payload=payload, created_at=now, updated_at=now)
+            self._jobs[job.id] = job
+            pending.append(job.id)
+            self._cond.notify_all()
+            return replace(job)
+
+    def claim(self, pool: str, timeout: float) -> Optional[Job]:
+        with self._cond:
+            pending = self._pending.setdefault(pool, deque())
+            if not self._cond.wait_for(lambda: pending, timeout=timeout):
+                return None
+            job = self._jobs[pending.popleft()]
+            job.status = RUNNING
+            job.updated_at = time.time()
+            return replace(job)
+
+    def complete(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status == CANCELLED:
+                return
+            job.status = FAILED if error is not None else SUCCEEDED
+            job.result = result
+            job.error = error
+            job.updated_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == QUEUED:
+                self._pending[job.pool].remove(job_id)
+            if job.status not in FINISHED_STATES:
+                job.status = CANCELLED
+                job.updated_at = time.time()
+            return replace(job)
+
+    def depth(self, pool: str) -> int:
+        with self._cond:
+            return len(self._pending.get(pool, ()))
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Queue persisted in a local SQLite file (WAL mode), shareable by several processes.
+    A claim is a single atomic UPDATE that stamps the job with this queue's owner id
+    and a lease, which the JobManager renews while the job runs. Running jobs are
+    only taken over once their lease has expired, i.e. their worker crashed or
+    was killed; a live worker's jobs are never re-queued, however long they take.
+
+    Args:
+        lease_seconds (float): How long a claimed job stays reserved without a
+            renewal; also how long a crashed worker's job waits to be retried.
+    """
+
+    def __init__(self, path: str, max_size: int, result_ttl: float, lease_seconds: float = 60.0):
+        super().__init__(max_size, result_ttl)
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = lease_seconds / 3 # Two renewals may be missed before the lease lapses
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._cond:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    pool TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT,
+                    lease_expires_at REAL
+                )
+                """
+            )
+            # Files created before leases existed
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (pool, status, created_at)")
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            kind=row["kind"],
+            pool=row["pool"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+
+    def _count_queued(self, pool: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE pool = ? AND status = ?", (pool, QUEUED)
+        ).fetchone()[0]
+
+    def submit(self, kind: str, pool: str, payload: Dict[str, Any]) -> Job:
+        with self._cond:
+            now = time.time()
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (*FINISHED_STATES, now - self.result_ttl)
+            )
+            if self._count_queued(pool) >= self.max_size:
+                raise QueueFullError(f"The '{pool}' job queue is full ({self.max_size} jobs).")
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, pool=pool, payload=payload, created_at=now, updated_at=now)
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, pool, payload, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, kind, pool, json.dumps(payload), QUEUED, now, now)
+            )
+            self._cond.notify_all()
+            return job
+
+    def _claim_next(self, pool: str) -> Optional[Job]:
+        now = time.time()
+        claimable = "(status = ? OR (status = ? AND lease_expires_at < ?))"
+        # One statement: the sub-select and the guarded update run under SQLite's
+        # write lock, so two processes can never claim the same job
+        cursor = self._conn.execute(
+            f"UPDATE jobs SET status = ?, owner = ?, lease_expires_at = ?, updated_at = ? "
+            f"WHERE id = (SELECT id FROM jobs WHERE pool = ? AND {claimable} ORDER BY created_at LIMIT 1) "
+            f"AND {claimable} RETURNING *",
+            (
+                RUNNING, self.owner, now + self.lease_seconds, now,
+                pool, QUEUED, RUNNING, now,
+                QUEUED, RUNNING, now
+            )
+        )
+        rows = cursor.fetchall()
+        return self._to_job(rows[0]) if rows else None
+
+    def claim(self, pool: str, timeout: float) -> Optional[Job]:
+        with self._cond:
+            job = self._claim_next(pool)
+            if job is None:
+                # Woken by submit() in this process; the timeout covers other writers
+                self._cond.wait(timeout)
+                job = self._claim_next(pool)
+            return job
+
+    def renew(self, job_id: str) -> bool:
+        with self._cond:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND owner = ?",
+                (time.time() + self.lease_seconds, job_id, RUNNING, self.owner)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """Also a no-op once the lease was lost and another worker took the job over."""
+        with self._cond:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND status = ? AND owner = ?",
+                (
+                    FAILED if error is not None else SUCCEEDED,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    RUNNING,
+                    self.owner
+                )
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._to_job(row) if row else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+            )
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._to_job(row) if row else None
+
+    def depth(self, pool: str) -> int:
+        with self._cond:
+            return self._count_queued(pool)
+
+    def close(self) -> None:
+        """Hands jobs this queue still holds back to other processes, then closes."""
+        with self._cond:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_expires_at = NULL WHERE status = ? AND owner = ?",
+                (QUEUED, RUNNING, self.owner)
+            )
+            self._conn.close()
+
+
+def create_job_queue() -> JobQueue:
+    """Builds the queue backend selected by `JOB_QUEUE_BACKEND`."""
+    if settings.JOB_QUEUE_BACKEND == "sqlite":
+        return SQLiteJobQueue(
+            settings.JOB_QUEUE_PATH, settings.JOB_QUEUE_MAX_SIZE, settings.JOB_RESULT_TTL, settings.JOB_LEASE_SECONDS
+        )
+    if settings.JOB_QUEUE_BACKEND == "memory":
+        return InMemoryJobQueue(settings.JOB_QUEUE_MAX_SIZE, settings.JOB_RESULT_TTL)
+    raise ValueError(f"Unknown JOB_QUEUE_BACKEND '{settings.JOB_QUEUE_BACKEND}'. Expected 'memory' or 'sqlite'.")
+
+
+class JobManager:
+    """
+    Owns the worker threads. Each job kind is routed to a named pool
+    ("io" or "cpu"), and each pool has its own thread count.
+
+    Args:
+        queue (JobQueue): Storage + dispatch backend.
+        handlers (dict): kind -> (pool, fn). `fn` takes the payload dict and returns a JSON-able dict.
+        pool_sizes (dict): pool -> number of worker threads.
+
+    If the queue uses leases, one heartbeat thread renews them for every
+    in-flight job, so long LLM calls are never mistaken for crashed workers.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Dict[str, Any]]]],
+        pool_sizes: Dict[str, int],
+        poll_interval: float = 0.5
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.pool_sizes = pool_sizes
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stop_heartbeat = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Starts the worker threads. Safe to call more than once."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            self._stop_heartbeat.clear()
+            for pool, size in self.pool_sizes.items():
+                for i in range(size):
+                    thread = threading.Thread(target=self._worker, args=(pool,), name=f"job-{pool}-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            if self.queue.heartbeat_interval:
+                self._heartbeat = threading.Thread(target=self._renew_leases, name="job-heartbeat", daemon=True)
+                self._heartbeat.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Signals workers to exit and waits for their in-flight jobs to finish
+        (bounded by the upstream timeouts), so the queue can be closed safely.
+        """
+        with self._lock:
+            self._stop.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+            # Only after the workers: draining jobs still need their leases renewed
+            self._stop_heartbeat.set()
+            if self._heartbeat is not None:
+                self._heartbeat.join(timeout)
+                self._heartbeat = None
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        """
+        Enqueues a job.
+
+        Raises:
+            KeyError: Unknown job kind.
+            QueueFullError: The target pool is at capacity.
+        """
+        self.start()
+        pool = self.handlers[kind][0]
+        try:
+            job = self.queue.submit(kind, pool, payload)
+        except QueueFullError:
+            JOBS_TOTAL.labels(kind=kind, status="rejected").inc()
+            raise
+        JOBS_TOTAL.labels(kind=kind, status=QUEUED).inc()
+        JOB_QUEUE_DEPTH.labels(pool=pool).set(self.queue.depth(pool))
+        return job
+
+    def _renew_leases(self) -> None:
+        while not self._stop_heartbeat.wait(self.queue.heartbeat_interval):
+            with self._in_flight_lock:
+                job_ids = list(self._in_flight)
+            for job_id in job_ids:
+                self.queue.renew(job_id)
+
+    def _worker(self, pool: str) -> None:
+        while not self._stop.is_set():
+            job = self.queue.claim(pool, timeout=self.poll_interval)
+            if job is None:
+                continue
+            JOB_QUEUE_DEPTH.labels(pool=pool).set(self.queue.depth(pool))
+
+            _, handler = self.handlers[job.kind]
+            with self._in_flight_lock:
+                self._in_flight.add(job.id)
+            try:
+                self.queue.complete(job.id, result=handler(job.payload))
+                JOBS_TOTAL.labels(kind=job.kind, status=SUCCEEDED).inc()
+            except Exception as e:
+                self.queue.complete(job.id, error=str(e))
+                JOBS_TOTAL.labels(kind=job.kind, status=FAILED).inc()
+            finally:
+                with self._in_flight_lock:
+                    self._in_flight.discard(job.id)
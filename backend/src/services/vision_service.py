@@ -6,20 +6,38 @@ Uses Pillow (PIL) for image processing and NumPy for vector math.
 """
 
 import json
+import os
 import httpx
 import numpy as np
 from io import BytesIO
 from PIL import Image
 from typing import List, Tuple
+from src.core.metrics import record_cache, track_stage
 from src.models.schemas import ImageValidationResponse
 
 # Load rules
 PALETTE_PATH = "data/rules/palette.json"
 
-def _load_palette() -> dict:
-    """Loads the approved colors from JSON."""
-    with open(PALETTE_PATH, "r") as f:
-        return json.load(f)
+# Parsed palettes by path, each tagged with its file mtime so edits are picked up without a restart
+_palette_cache = {}
+
+def _load_palette(path: str = PALETTE_PATH) -> dict:
+    """Loads the approved colors from JSON (cached until the file changes)."""
+    mtime = os.path.getmtime(path)
+    cached = _palette_cache.get(path)
+    if cached and cached[0] == mtime:
+        record_cache("palette", hit=True)
+        return cached[1]
+
+    record_cache("palette", hit=False)
+    with open(path, "r") as f:
+        rules = json.load(f)
+    _palette_cache[path] = (mtime, rules)
+    return rules
+
+def evict_palette(path: str) -> None:
+    """Drops a cached palette, e.g. when its brand leaves the registry pool."""
+    _palette_cache.pop(path, None)
 
 def _hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Converts #RRGGBB to (R, G, B) tuple."""
@@ -37,12 +55,13 @@ def _calculate_distance(color1: Tuple, color2: Tuple) -> float:
     """
     return np.sqrt(np.sum((np.array(color1) - np.array(color2)) ** 2))
 
-def validate_image_url(image_url: str) -> ImageValidationResponse:
+def validate_image_url(image_url: str, palette_path: str = PALETTE_PATH) -> ImageValidationResponse:
     """
     Downloads an image and checks if its dominant colors match the brand palette.
     
     Args:
         image_url (str): The public URL of the image.
+        palette_path (str): The brand's palette JSON; defaults to the default brand's.
         
     Returns:
         ImageValidationResponse: Compliance status and analysis.
@@ -55,9 +74,12 @@ def validate_image_url(image_url: str) -> ImageValidationResponse:
     # 1. Download Image
     try:
         # FIX: Use the string 'url_str' instead of the object 'image_url'
-        response = httpx.get(url_str, timeout=10.0)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content)).convert("RGB")
+        with track_stage("download"):
+            response = httpx.get(url_str, timeout=10.0)
+            response.raise_for_status()
+        # Image.open is lazy; convert() forces the actual decode
+        with track_stage("decode"):
+            img = Image.open(BytesIO(response.content)).convert("RGB")
     except Exception as e:
         return ImageValidationResponse(
             is_compliant=False,
@@ -67,10 +89,11 @@ def validate_image_url(image_url: str) -> ImageValidationResponse:
 
     # 2. Extract Dominant Colors
     # We resize to speed up processing, then quantize to reduce to top 5 colors
-    img = img.resize((150, 150))
-    # 'quantize' reduces the image to N colors. We ask for 5.
-    # Note: quantize requires P mode, so we convert back to RGB palette.
-    quantized = img.quantize(colors=5, method=2) 
+    with track_stage("quantize"):
+        img = img.resize((150, 150))
+        # 'quantize' reduces the image to N colors. We ask for 5.
+        # Note: quantize requires P mode, so we convert back to RGB palette.
+        quantized = img.quantize(colors=5, method=2) 
     dominant_palette = quantized.getpalette()[:15] # First 5 RGB triplets (5 * 3 = 15 values)
     
     # Parse the flat list [r,g,b, r,g,b...] into tuples [(r,g,b), ...]
@@ -80,7 +103,7 @@ def validate_image_url(image_url: str) -> ImageValidationResponse:
     ]
 
     # 3. Load Rules
-    rules = _load_palette()
+    rules = _load_palette(palette_path)
     brand_rgbs = [_hex_to_rgb(c) for c in rules["colors"]]
     tolerance = rules["tolerance"]
     
@@ -94,13 +117,14 @@ def validate_image_url(image_url: str) -> ImageValidationResponse:
     # At least 50% of dominant colors must map to the palette.
     
     matches = 0
-    for dom_c in dominant_rgbs:
-        # Find distance to the closest brand color
-        distances = [_calculate_distance(dom_c, brand_c) for brand_c in brand_rgbs]
-        min_dist = min(distances)
-        
-        if min_dist <= tolerance:
-            matches += 1
+    with track_stage("compare"):
+        for dom_c in dominant_rgbs:
+            # Find distance to the closest brand color
+            distances = [_calculate_distance(dom_c, brand_c) for brand_c in brand_rgbs]
+            min_dist = min(distances)
+            
+            if min_dist <= tolerance:
+                matches += 1
             
     # Logic: If 3 out of 5 dominant colors fit the palette, it passes.
     is_compliant = matches >= 2 
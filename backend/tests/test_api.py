@@ -17,7 +17,7 @@ def test_health_check():
     assert response.status_code == 200
     assert response.json()["status"] == "operational"
 
-@patch("src.app.brand_agent.generate")
+@patch("src.core.agent.brand_agent.generate")
 @patch("src.app.brand_guard.evaluate")
 def test_generate_content_flow(mock_evaluate, mock_generate):
     """
@@ -0,0 +1,132 @@
+"""
+test_brands.py
+--------------
+Tests for multi-brand tenancy: brand resolution, the LRU registry pool
+and brand routing in the API. Brand contexts are mocked, so no vector
+stores are opened.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from chromadb.api.shared_system_client import SharedSystemClient
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.core import brands, retrieval
+from src.core.brands import BrandRegistry, UnknownBrandError, resolve_brand
+from src.services import vision_service
+
+client = TestClient(app)
+
+@pytest.fixture
+def brands_dir(tmp_path, monkeypatch):
+    """Creates two sub-brands; only 'weather' ships its own palette."""
+    (tmp_path / "weather" / "rules").mkdir(parents=True)
+    (tmp_path / "weather" / "rules" / "palette.json").write_text('{"colors": ["#FF0000"], "tolerance": 10}')
+    (tmp_path / "industrial").mkdir()
+    monkeypatch.setattr(brands.settings, "BRANDS_DIR", str(tmp_path))
+    return tmp_path
+
+def _fake_open(paths):
+    context = MagicMock()
+    context.paths = paths
+    return context
+
+def test_resolve_default_brand():
+    """The default brand keeps the legacy single-brand locations."""
+    paths = resolve_brand(None)
+    assert paths.brand_id == brands.settings.DEFAULT_BRAND
+    assert paths.collection_name == brands.settings.CHROMA_COLLECTION_NAME
+    assert paths.voice_dir == "data/brand_voice"
+
+def test_resolve_sub_brands(brands_dir):
+    """Sub-brands get their own collection; palette falls back to the default."""
+    weather = resolve_brand("weather")
+    industrial = resolve_brand("industrial")
+
+    assert weather.collection_name.endswith("-weather")
+    assert weather.chroma_path.endswith("brands/weather") # Own Chroma client, closable on eviction
+    assert weather.palette_path == str(brands_dir / "weather" / "rules" / "palette.json")
+    assert industrial.palette_path == brands.PALETTE_PATH
+
+def test_resolve_unknown_brand(brands_dir):
+    with pytest.raises(UnknownBrandError):
+        resolve_brand("missing")
+    with pytest.raises(UnknownBrandError):
+        resolve_brand("../etc") # Never escapes BRANDS_DIR
+
+@pytest.mark.parametrize("brand", ["weather-", "weather_", "-weather", "Weather"])
+def test_malformed_brand_id_is_rejected(brand):
+    """Ids Chroma cannot use as a collection suffix fail validation up front."""
+    payload = {"topic": "Test Topic", "content_type": "Email", "brand": brand}
+    assert client.post("/api/v1/generate", json=payload).status_code == 422
+
+@patch("src.core.brands.BrandContext.open", side_effect=_fake_open)
+def test_registry_evicts_least_recently_used(mock_open, brands_dir):
+    """Only `max_size` sub-brands stay open; the coldest one is closed."""
+    (brands_dir / "marine").mkdir()
+    registry = BrandRegistry(max_size=2)
+
+    weather = registry.get("weather")
+    registry.get("industrial")
+    assert registry.get("weather") is weather # Hit: no reopen, now the hottest
+    registry.get("marine")
+
+    assert registry.open_brands() == ["weather", "marine"]
+    assert mock_open.call_count == 3
+    weather.close.assert_not_called()
+
+@pytest.fixture
+def hashing_chroma(tmp_path, monkeypatch):
+    """Real vector stores in a scratch directory, embedded locally."""
+    monkeypatch.setattr(retrieval.settings, "CHROMA_DB_PATH", str(tmp_path / "chroma"))
+    monkeypatch.setattr(retrieval.settings, "EMBEDDING_PROVIDER", "hashing")
+    retrieval.get_embedding_function.cache_clear()
+    yield
+    retrieval.get_embedding_function.cache_clear()
+
+def _chroma_is_open(context) -> bool:
+    """Whether Chroma still holds the system (sqlite + in-memory index cache) behind this brand."""
+    return context.agent.retriever.vectorstore._client._identifier in SharedSystemClient._identifier_to_system
+
+def test_evicted_brand_releases_its_chroma_client(brands_dir, hashing_chroma):
+    """Eviction stops the brand's Chroma system, unloading its index, and drops its palette."""
+    registry = BrandRegistry(max_size=1)
+    weather = registry.get("weather")
+    assert _chroma_is_open(weather)
+
+    industrial = registry.get("industrial")
+
+    assert not _chroma_is_open(weather)
+    assert weather.paths.palette_path not in vision_service._palette_cache
+    assert _chroma_is_open(industrial)
+    assert _chroma_is_open(registry.get()) # The default brand is pinned
+
+def test_brand_in_use_is_released_after_the_request(brands_dir, hashing_chroma):
+    """A brand evicted mid-request stays usable until that request finishes."""
+    registry = BrandRegistry(max_size=1)
+
+    with registry.use("weather") as weather:
+        registry.get("industrial")
+        assert registry.open_brands() == ["industrial"]
+        assert _chroma_is_open(weather)
+        weather.agent.retriever.invoke("radar") # Still searchable
+
+    assert not _chroma_is_open(weather)
+
+@patch("src.app.validate_image_url")
+def test_validate_image_uses_brand_palette(mock_validate, brands_dir):
+    """The request's brand selects the palette used for validation."""
+    mock_validate.return_value = {"is_compliant": True, "dominant_colors": [], "violation_reason": None}
+
+    with patch("src.core.brands.BrandContext.open") as mock_open:
+        response = client.post("/api/v1/validate-image", json={"image_url": "http://test.com/a.png", "brand": "weather"})
+
+    assert response.status_code == 200
+    assert mock_validate.call_args.kwargs["palette_path"].endswith("weather/rules/palette.json")
+    mock_open.assert_not_called() # No vector store for a palette check
+
+def test_unknown_brand_returns_404(brands_dir):
+    payload = {"topic": "Test Topic", "content_type": "Email", "brand": "missing"}
+    assert client.post("/api/v1/generate", json=payload).status_code == 404
+    assert client.post("/api/v1/jobs/generate", json=payload).status_code == 404
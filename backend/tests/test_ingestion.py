@@ -0,0 +1,35 @@
+"""
+test_ingestion.py
+-----------------
+Unit tests for ingestion metadata tagging (source + content-type partition).
+"""
+
+import json
+from src.services.ingestion import load_documents
+
+def test_content_type_from_filename_and_manifest(tmp_path):
+    """File name prefixes set the partition unless the manifest overrides it."""
+    (tmp_path / "social_mars_mission.txt").write_text("Vaisala sensors on Mars.")
+    (tmp_path / "product_launch_indigo.txt").write_text("Introducing Indigo500.")
+    (tmp_path / "misc_notes.txt").write_text("Untyped copy.")
+    (tmp_path / "manifest.json").write_text(json.dumps({
+        "product_launch_indigo.txt": {"content_type": "Blog article"}
+    }))
+
+    tags = {doc.metadata["source"]: doc.metadata["content_type"] for doc in load_documents(str(tmp_path))}
+
+    assert tags == {
+        "social_mars_mission.txt": "social",
+        "product_launch_indigo.txt": "editorial",
+        "misc_notes.txt": "general",
+    }
+
+def test_sample_corpus_covers_every_partition():
+    """The shipped brand voice files are tagged by format, not topic."""
+    tags = {doc.metadata["source"]: doc.metadata["content_type"] for doc in load_documents("data/brand_voice")}
+
+    assert tags == {
+        "product_launch_humidity.txt": "press",
+        "social_mars_mission.txt": "social",
+        "sustainability_vision.txt": "editorial",
+    }
@@ -0,0 +1,175 @@
+"""
+test_jobs.py
+------------
+Tests for the async Job API and its queue backends.
+Mocks the Agent & Guardrails like test_api.py.
+"""
+
+import threading
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from src.app import app, job_manager
+from src.services.jobs import (
+    CANCELLED, QUEUED, RUNNING, SUCCEEDED, InMemoryJobQueue, JobManager, JobQueue, QueueFullError, SQLiteJobQueue
+)
+
+client = TestClient(app)
+
+@patch("src.core.agent.brand_agent.generate")
+@patch("src.app.brand_guard.evaluate")
+def test_generate_job_flow(mock_evaluate, mock_generate):
+    """Submit returns 202 immediately; long-polling yields the BrandResponse."""
+    mock_generate.return_value = {"content": "Draft content...", "used_references": ["ref1"]}
+    mock_evaluate.return_value = {"score": 91, "reasoning": "Grounded."}
+
+    response = client.post("/api/v1/jobs/generate", json={"topic": "Test Topic", "content_type": "Email"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    result = client.get(f"/api/v1/jobs/{job_id}", params={"wait": 5}).json()
+    assert result["status"] == SUCCEEDED
+    assert result["result"]["brand_score"] == 91
+
+def test_full_queue_returns_429():
+    """Backpressure: a full pool rejects submissions with Retry-After."""
+    with patch.object(job_manager.queue, "max_size", 0):
+        response = client.post("/api/v1/jobs/validate-image", json={"image_url": "http://test.com/a.png"})
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+def test_unknown_job_returns_404():
+    assert client.get("/api/v1/jobs/does-not-exist").status_code == 404
+    assert client.delete("/api/v1/jobs/does-not-exist").status_code == 404
+
+def test_cancel_race_with_expiry_returns_404():
+    """A job that disappears between lookup and cancel is a 404, not a 500."""
+    job = InMemoryJobQueue(max_size=1, result_ttl=60).submit("generate", "io", {})
+    with patch.object(job_manager.queue, "get", return_value=job), \
+         patch.object(job_manager.queue, "cancel", return_value=None):
+        assert client.delete(f"/api/v1/jobs/{job.id}").status_code == 404
+
+def test_shutdown_closes_queue():
+    """The app's lifespan closes the queue once the workers have stopped."""
+    with patch.object(job_manager.queue, "close") as mock_close:
+        with TestClient(app):
+            pass
+    mock_close.assert_called_once()
+
+def test_stop_waits_for_in_flight_jobs(tmp_path):
+    """stop() returns only after the running job is stored, so close() is safe."""
+    started = threading.Event()
+
+    def slow_handler(payload):
+        started.set()
+        threading.Event().wait(0.3)
+        return {"done": True}
+
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"), max_size=5, result_ttl=60)
+    manager = JobManager(queue, {"generate": ("io", slow_handler)}, {"io": 1}, poll_interval=0.05)
+    job = manager.submit("generate", {})
+    assert started.wait(5)
+
+    manager.stop()
+    queue.close()
+
+    reopened = SQLiteJobQueue(str(tmp_path / "jobs.db"), max_size=5, result_ttl=60)
+    assert reopened.get(job.id).result == {"done": True}
+    reopened.close()
+
+def test_lease_is_renewed_while_job_runs(tmp_path):
+    """A job outliving its lease is not taken over by another process while it still runs."""
+    path = str(tmp_path / "jobs.db")
+    started, release = threading.Event(), threading.Event()
+
+    def long_handler(payload):
+        started.set()
+        release.wait(5)
+        return {"done": True}
+
+    queue = SQLiteJobQueue(path, max_size=5, result_ttl=60, lease_seconds=0.3)
+    manager = JobManager(queue, {"generate": ("io", long_handler)}, {"io": 1}, poll_interval=0.05)
+    job = manager.submit("generate", {})
+    assert started.wait(5)
+
+    other_process = SQLiteJobQueue(path, max_size=5, result_ttl=60)
+    threading.Event().wait(1.0) # Several lease lengths
+    assert other_process.claim("io", timeout=0) is None
+
+    release.set()
+    manager.stop()
+    assert other_process.get(job.id).result == {"done": True}
+    queue.close()
+    other_process.close()
+
+def test_incomplete_backend_fails_at_construction():
+    """A backend that forgets part of the interface cannot be instantiated."""
+    class NoCancelQueue(JobQueue):
+        submit = claim = complete = get = depth = lambda self, *args, **kwargs: None
+
+    with pytest.raises(TypeError, match="cancel"):
+        NoCancelQueue(max_size=1, result_ttl=60)
+
+def test_memory_queue_capacity_and_cancel():
+    """Capacity is per pool, and cancelling a queued job frees its slot."""
+    queue = InMemoryJobQueue(max_size=1, result_ttl=60)
+    job = queue.submit("generate", "io", {})
+    queue.submit("validate_image", "cpu", {}) # Other pool is unaffected
+
+    with pytest.raises(QueueFullError):
+        queue.submit("generate", "io", {})
+
+    assert queue.cancel(job.id).status == CANCELLED
+    assert queue.claim("io", timeout=0) is None
+    assert queue.submit("generate", "io", {}).status == QUEUED
+
+def test_cancelled_running_job_discards_result():
+    """A job cancelled mid-flight stays cancelled when its worker completes."""
+    queue = InMemoryJobQueue(max_size=5, result_ttl=60)
+    job = queue.submit("generate", "io", {})
+    assert queue.claim("io", timeout=0).status == RUNNING
+
+    queue.cancel(job.id)
+    queue.complete(job.id, result={"content": "late"})
+
+    assert queue.get(job.id).status == CANCELLED
+    assert queue.get(job.id).result is None
+
+def test_sqlite_queue_survives_restart(tmp_path):
+    """Queued jobs, and running jobs whose lease expired, are resumed by a new process."""
+    path = str(tmp_path / "jobs.db")
+    crashed = SQLiteJobQueue(path, max_size=5, result_ttl=60, lease_seconds=0)
+    first = crashed.submit("generate", "io", {"topic": "Radar"})
+    second = crashed.submit("generate", "io", {"topic": "Humidity"})
+    crashed.claim("io", timeout=0) # 'first' is running when the process dies (no close())
+
+    reopened = SQLiteJobQueue(path, max_size=5, result_ttl=60)
+    claimed = [reopened.claim("io", timeout=0).id, reopened.claim("io", timeout=0).id]
+    assert claimed == [first.id, second.id]
+
+    crashed.complete(first.id, result={"stale": True}) # Lost its lease: ignored
+    reopened.complete(first.id, result={"ok": True})
+    assert reopened.get(first.id).status == SUCCEEDED
+    assert reopened.get(first.id).result == {"ok": True}
+    reopened.close()
+
+def test_sqlite_queue_shared_between_processes(tmp_path):
+    """A second process never re-queues or double-claims a live worker's job."""
+    path = str(tmp_path / "jobs.db")
+    first_process = SQLiteJobQueue(path, max_size=5, result_ttl=60)
+    running = first_process.submit("generate", "io", {"topic": "Radar"})
+    waiting = first_process.submit("generate", "io", {"topic": "Humidity"})
+    assert first_process.claim("io", timeout=0).id == running.id
+
+    second_process = SQLiteJobQueue(path, max_size=5, result_ttl=60)
+    assert second_process.get(running.id).status == RUNNING
+    assert second_process.claim("io", timeout=0).id == waiting.id
+    assert second_process.claim("io", timeout=0) is None
+    assert first_process.claim("io", timeout=0) is None
+
+    first_process.close() # Graceful shutdown hands unfinished work back
+    assert second_process.claim("io", timeout=0).id == running.id
+    second_process.close()
@@ -0,0 +1,61 @@
+"""
+test_metrics.py
+---------------
+Tests for the timing & metrics layer.
+Checks the Prometheus endpoint, the Server-Timing header and token counting.
+"""
+
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from langchain_core.outputs import LLMResult
+from prometheus_client import REGISTRY
+
+from src.app import app
+from src.core.metrics import TokenUsageCallback, track_request, track_stage
+
+client = TestClient(app)
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_metrics_endpoint():
+    """The scrape endpoint exposes the stage histogram."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "brandguardian_stage_duration_seconds" in response.text
+
+def test_server_timing_header():
+    """Stage timings recorded inside a request are mirrored in the header."""
+    def fake_generate(request):
+        with track_stage("retrieve"):
+            pass
+        return {"content": "Draft content...", "used_references": []}
+
+    with patch("src.core.agent.brand_agent.generate", side_effect=fake_generate), \
+         patch("src.app.brand_guard.evaluate", return_value={"score": 90, "reasoning": "Good."}):
+        response = client.post("/api/v1/generate", json={"topic": "Test Topic", "content_type": "Email"})
+
+    assert response.status_code == 200
+    header = response.headers["Server-Timing"]
+    assert "retrieve;dur=" in header
+    assert "total;dur=" in header
+
+def test_track_request_in_flight_gauge():
+    """The in-flight gauge is raised for the duration of the request only."""
+    labels = {"endpoint": "/test"}
+    with track_request("/test") as timings:
+        assert _sample("brandguardian_requests_in_flight", labels) == 1
+        with track_stage("decode"):
+            pass
+    assert _sample("brandguardian_requests_in_flight", labels) == 0
+    assert [stage for stage, _ in timings] == ["decode"]
+
+def test_token_usage_callback():
+    """Token usage reported by the LLM is counted per stage."""
+    before = _sample("brandguardian_llm_tokens_total", {"stage": "grade", "type": "completion"})
+    result = LLMResult(generations=[], llm_output={"token_usage": {"prompt_tokens": 12, "completion_tokens": 7}})
+
+    TokenUsageCallback("grade").on_llm_end(result)
+
+    after = _sample("brandguardian_llm_tokens_total", {"stage": "grade", "type": "completion"})
+    assert after - before == 7
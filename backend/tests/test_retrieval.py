@@ -0,0 +1,135 @@
+"""
+test_retrieval.py
+-----------------
+Unit tests for the pluggable embedding providers, collection tagging
+and content-type partitioned retrieval.
+Uses the local "hashing" provider so no network access is needed.
+"""
+
+import numpy as np
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from src.core import retrieval
+from src.core.agent import BrandAgent
+from src.core.retrieval import (
+    HashingEmbeddings, content_partition, get_embedding_function, get_vector_store, partition_counts,
+    record_partition_counts
+)
+
+@pytest.fixture
+def hashing_store(tmp_path, monkeypatch):
+    """Points the vector store at a scratch directory using the hashing provider."""
+    monkeypatch.setattr(retrieval.settings, "CHROMA_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(retrieval.settings, "CHROMA_COLLECTION_NAME", "test_brand_voice")
+    monkeypatch.setattr(retrieval.settings, "EMBEDDING_PROVIDER", "hashing")
+    get_embedding_function.cache_clear()
+    yield
+    get_embedding_function.cache_clear()
+
+def test_hashing_embeddings_are_deterministic_and_normalized():
+    """Same text -> same unit vector; batch and single-query paths agree."""
+    embeddings = HashingEmbeddings(dim=256)
+    query = embeddings.embed_query("Humidity sensor for Mars")
+    batch = embeddings.embed_documents(["Humidity sensor for Mars", ""])
+
+    assert len(query) == 256
+    assert np.isclose(np.linalg.norm(query), 1.0)
+    assert np.allclose(query, batch[0])
+    assert not np.any(batch[1]) # Empty text embeds to the zero vector
+
+def test_hashing_embeddings_rank_related_text_higher():
+    """Overlapping vocabulary should yield higher cosine similarity."""
+    embeddings = HashingEmbeddings()
+    query = np.array(embeddings.embed_query("weather radar for airports"))
+    related, unrelated = np.array(embeddings.embed_documents([
+        "Airports rely on our weather radar network.",
+        "Calibration services for life science laboratories."
+    ]))
+
+    assert query @ related > query @ unrelated
+
+def test_unknown_provider_raises(monkeypatch):
+    """Misconfiguration fails loudly instead of silently falling back."""
+    monkeypatch.setattr(retrieval.settings, "EMBEDDING_PROVIDER", "nonexistent")
+    get_embedding_function.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="Unknown EMBEDDING_PROVIDER"):
+            get_embedding_function()
+    finally:
+        get_embedding_function.cache_clear()
+
+def test_collection_is_tagged_and_retrievable(hashing_store):
+    """Documents ingested with the local provider can be found again by MMR."""
+    store = get_vector_store()
+    store.add_texts(["Weather radar keeps airports safe.", "Humidity probes for pharma cleanrooms."])
+
+    assert store._collection.metadata["embedding_provider"] == "hashing:512"
+    docs = store.max_marginal_relevance_search("airport weather radar", k=1, fetch_k=2)
+    assert docs[0].page_content.startswith("Weather radar")
+
+def test_provider_mismatch_is_rejected(hashing_store, monkeypatch):
+    """Opening a collection with a different embedding space raises."""
+    get_vector_store().add_texts(["Weather radar keeps airports safe."])
+
+    monkeypatch.setattr(retrieval.settings, "EMBEDDING_DIM", 256)
+    get_embedding_function.cache_clear()
+    with pytest.raises(ValueError, match="was built with 'hashing:512'"):
+        get_vector_store()
+
+def test_untagged_legacy_collection_is_not_claimed(hashing_store):
+    """Pre-existing untagged data is assumed to be OpenAI-embedded, never re-tagged."""
+    legacy = Chroma( # Built the way collections were before provider tagging
+        persist_directory=retrieval.settings.CHROMA_DB_PATH,
+        embedding_function=HashingEmbeddings(),
+        collection_name=retrieval.settings.CHROMA_COLLECTION_NAME
+    )
+    legacy.add_texts(["Weather radar keeps airports safe."])
+
+    with pytest.raises(ValueError, match=f"was built with '{retrieval.LEGACY_EMBEDDING_TAG}'"):
+        get_vector_store()
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("LinkedIn Post", "social"),
+    ("Press Release", "press"),
+    ("Blog post", "editorial"), # Checked before the "post" keyword
+    ("Internal Memo", "editorial"),
+    ("Haiku", None),
+    ("Press Releases", "press"),
+    ("Television ad", None), # Whole words only: no "vision" inside "television"
+    ("Poster", None), # ... and no "post" inside "poster"
+    ("Sustainability vision", None), # Topics are not formats
+])
+def test_content_partition(content_type, expected):
+    assert content_partition(content_type) == expected
+
+def test_agent_searches_partition_when_large_enough(hashing_store, monkeypatch):
+    """Partitioned search is used only when enabled and the partition has enough chunks."""
+    monkeypatch.setattr(retrieval.settings, "RAG_PARTITION_MIN_CHUNKS", 2)
+    store = get_vector_store()
+    documents = [
+        Document(page_content="Radar post one.", metadata={"content_type": "social"}),
+        Document(page_content="Radar post two.", metadata={"content_type": "social"}),
+        Document(page_content="Press release on radar.", metadata={"content_type": "press"}),
+    ]
+    store.add_documents(documents)
+    record_partition_counts(store, documents)
+    agent = BrandAgent(retriever=store.as_retriever(search_type="mmr", search_kwargs={"k": 2, "fetch_k": 3}))
+
+    assert agent._search_filter("LinkedIn Post") is None # Off by default
+
+    monkeypatch.setattr(retrieval.settings, "RAG_PARTITION_FILTER", True)
+    assert agent._search_filter("LinkedIn Post") == {"content_type": "social"}
+    assert agent._search_filter("Press Release") is None # Only 1 chunk: fall back
+    assert agent._search_filter("Haiku") is None
+
+def test_partition_counts_accumulate_in_collection_metadata(hashing_store):
+    """Counts are kept by ingestion, so queries read them without scanning the partition."""
+    store = get_vector_store()
+    for batch in (["social", "press"], ["social"]):
+        documents = [Document(page_content=f"{p} copy", metadata={"content_type": p}) for p in batch]
+        store.add_documents(documents)
+        record_partition_counts(store, documents)
+
+    assert partition_counts(store) == {"social": 2, "press": 1}
+    assert store._client.get_collection(store._collection.name).metadata["embedding_provider"] == "hashing:512"
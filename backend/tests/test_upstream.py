@@ -0,0 +1,151 @@
+"""
+test_upstream.py
+----------------
+Tests for the shared upstream client.
+Runs against a local mock HTTP server so retries and circuit breaking
+are exercised over real sockets.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from src.core.upstream import (
+    CircuitBreaker, CircuitOpenError, ResilientTransport, get_chat_model, get_http_client
+)
+
+CHAT_COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-3.5-turbo",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "Measured, not hyped."},
+        "finish_reason": "stop"
+    }],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 4, "total_tokens": 9}
+}
+
+@pytest.fixture
+def mock_server():
+    """
+    Starts a local server that replays a scripted list of (status, body[, headers])
+    replies. The last reply repeats once the script is exhausted.
+    """
+    state = {"script": [(200, {})], "hits": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            index = min(state["hits"], len(state["script"]) - 1)
+            state["hits"] += 1
+            status, body, *headers = state["script"][index]
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in (headers[0] if headers else {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+def _client(max_retries=2, failure_threshold=5):
+    transport = ResilientTransport(
+        httpx.HTTPTransport(),
+        breaker=CircuitBreaker(failure_threshold, reset_timeout=60),
+        max_retries=max_retries,
+        backoff_base=0.001,
+        backoff_max=0.01
+    )
+    return httpx.Client(transport=transport, timeout=5.0)
+
+def test_retries_transient_errors(mock_server):
+    """Transient 503/429 replies are retried until the upstream recovers."""
+    mock_server["script"] = [(503, {}), (429, {}), (200, {"ok": True})]
+
+    response = _client().post(mock_server["url"], json={})
+
+    assert response.status_code == 200
+    assert mock_server["hits"] == 3
+
+def test_does_not_retry_client_errors(mock_server):
+    """4xx responses (other than 429) are returned immediately."""
+    mock_server["script"] = [(400, {"error": "bad request"})]
+
+    response = _client().post(mock_server["url"], json={})
+
+    assert response.status_code == 400
+    assert mock_server["hits"] == 1
+
+def test_circuit_opens_and_fails_fast(mock_server):
+    """Once the failure threshold is reached, requests never leave the process."""
+    mock_server["script"] = [(503, {})]
+    client = _client(max_retries=0, failure_threshold=2)
+
+    client.post(mock_server["url"], json={})
+    client.post(mock_server["url"], json={})
+    with pytest.raises(CircuitOpenError):
+        client.post(mock_server["url"], json={})
+
+    assert mock_server["hits"] == 2
+
+def test_rate_limiting_does_not_open_circuit(mock_server):
+    """429 means the upstream is healthy but busy: it is retried, never a breaker failure."""
+    mock_server["script"] = [(429, {})]
+    client = _client(max_retries=0, failure_threshold=2)
+
+    for _ in range(3):
+        assert client.post(mock_server["url"], json={}).status_code == 429
+
+    assert mock_server["hits"] == 3
+
+def test_long_retry_after_is_not_cut_short(mock_server):
+    """A Retry-After beyond the backoff cap is surfaced instead of retrying too early."""
+    mock_server["script"] = [(429, {}, {"Retry-After": "30"}), (200, {"ok": True})]
+
+    response = _client().post(mock_server["url"], json={})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert mock_server["hits"] == 1
+
+def test_circuit_half_open_probe():
+    """After the reset timeout a single probe is allowed; success closes the circuit."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    assert breaker.allow_request() is False
+
+    now[0] = 10.0
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False # Only one probe in flight
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_chat_model_uses_shared_client(mock_server, monkeypatch):
+    """Chat calls go through the pooled client and its retry policy."""
+    mock_server["script"] = [(502, {}), (200, CHAT_COMPLETION)]
+    monkeypatch.setattr("src.core.upstream.settings.OPENAI_BASE_URL", mock_server["url"])
+
+    llm = get_chat_model(temperature=0)
+    result = llm.invoke("Describe the sensor.")
+
+    assert llm.http_client is get_http_client()
+    assert result.content == "Measured, not hyped."
+    assert mock_server["hits"] == 2